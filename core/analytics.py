@@ -10,6 +10,7 @@
 
 import asyncio
 import json
+import re
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -92,7 +93,6 @@ class ContentAnalytics:
 
             # 提取数字的辅助函数
             def extract_number(text):
-                import re
                 if not text:
                     return 0
                 # 提取所有数字
@@ -0,0 +1,128 @@
+"""
+ASR 转录结果缓存
+以视频文件内容哈希为键，缓存转录文本，相同视频重复出现时跳过上传与转录
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+try:
+    import blake3  # 可选依赖：pip install blake3，Rust 实现 + SIMD + 多线程，大文件哈希快数倍
+except ImportError:
+    blake3 = None
+
+HASH_CHUNK_SIZE = 1 << 20  # 1 MiB
+SAVE_INTERVAL = 30  # 两次落盘的最小间隔（秒），期间的写入合并到下一次落盘或 flush()
+
+
+def hash_file(path: Path, algorithm: Optional[str] = None) -> str:
+    """
+    流式计算文件内容哈希
+
+    默认用 blake3（已安装时，多线程 mmap 计算），否则用 blake2b（标准库自带且比 sha256 快）。
+    两者摘要长度不同，切换后旧缓存只会失效，不会误命中。
+
+    Args:
+        path: 文件路径
+        algorithm: hashlib 算法名；指定时不使用 blake3
+
+    Returns:
+        十六进制摘要
+    """
+    if algorithm is None:
+        if blake3 is not None:
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(path)
+            return hasher.hexdigest()
+        algorithm = "blake2b"
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        while buf := f.read(HASH_CHUNK_SIZE):
+            h.update(buf)
+    return h.hexdigest()
+
+
+class ASRCache:
+    """
+    基于内容哈希的转录缓存（JSON 持久化，带 TTL 与 LRU 淘汰）
+
+    get/set 可能分别在事件循环和 asyncio.to_thread 的工作线程里并发调用，内部加锁。
+    """
+
+    def __init__(self, cache_file: Path, ttl: int = 30 * 86400, max_entries: int = 2000):
+        """
+        Args:
+            cache_file: 缓存文件路径
+            ttl: 缓存有效期（秒）
+            max_entries: 最多保留条目数，超出时淘汰最久未使用的
+        """
+        self.cache_file = Path(cache_file)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()  # 保护 _entries
+        self._save_lock = threading.Lock()  # 串行化文件写入
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        """从磁盘加载缓存，文件损坏时从空缓存开始"""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # 按写入时间排序，保证 LRU 顺序
+            for digest, entry in sorted(data.items(), key=lambda kv: kv[1].get("ts", 0)):
+                self._entries[digest] = entry
+        except Exception:
+            self._entries = OrderedDict()
+
+    def _save(self):
+        """把当前条目的快照写回磁盘（序列化与写文件都在 _lock 之外进行）"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = dict(self._entries)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+
+    def flush(self):
+        """把尚未落盘的写入立即写回磁盘"""
+        self._save()
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        查询缓存
+
+        Returns:
+            缓存的转录文本；未命中或已过期返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if time.time() - entry.get("ts", 0) > self.ttl:
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return entry.get("text", "")
+
+    def set(self, digest: str, text: str):
+        """写入缓存；距上次落盘超过 SAVE_INTERVAL 时顺带持久化，否则留给下一次落盘或 flush()"""
+        with self._lock:
+            self._entries[digest] = {"text": text, "ts": time.time()}
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+            due = time.monotonic() - self._last_save >= SAVE_INTERVAL
+        if due:
+            self._save()
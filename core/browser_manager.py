@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from playwright.async_api import async_playwright
 from config.settings import CDP_URL, BASE_URL
 import httpx
@@ -64,4 +67,52 @@ class BrowserManager:
             await self.browser.close()
         if self.playwright:
             await self.playwright.stop()
-        print("[System] 已断开 CDP 连接")
\ No newline at end of file
+        print("[System] 已断开 CDP 连接")
+
+
+class BrowserPagePool:
+    """同一浏览器上下文中的标签页池，供多个协程并发打开详情页"""
+
+    def __init__(self, context, max_pages: int = 3):
+        self.context = context
+        self.max_pages = max_pages
+        self._pages = []  # 已创建的全部标签页
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    async def acquire(self):
+        """取一个空闲标签页；未达上限时新建，否则等待其他协程归还"""
+        if self._idle.empty() and len(self._pages) < self.max_pages:
+            self._pages.append(None)  # 先占位，避免并发时超出上限
+            try:
+                page = await self.context.new_page()
+            except Exception:
+                self._pages.remove(None)
+                raise
+            self._pages[self._pages.index(None)] = page
+            return page
+        return await self._idle.get()
+
+    def release(self, page):
+        """归还标签页"""
+        self._idle.put_nowait(page)
+
+    @asynccontextmanager
+    async def page(self):
+        """async with pool.page() as page: ... 用完自动归还"""
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            self.release(page)
+
+    async def close(self):
+        """关闭池中创建的所有标签页"""
+        for page in self._pages:
+            if page is None:
+                continue
+            try:
+                await page.close()
+            except Exception:
+                pass
+        self._pages = []
+        self._idle = asyncio.Queue()
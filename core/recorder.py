@@ -1,10 +1,45 @@
 import os
+import atexit
 import json
 import logging
+import queue
 import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+
+class AsyncLogWriter:
+    """后台线程日志写入器
+
+    logger 上只挂一个 QueueHandler，log 调用只把记录（含级别、消息、时间戳）放入队列后立即返回，
+    文件/控制台的实际写入由 QueueListener 的后台线程完成，不阻塞事件循环
+    """
+
+    def __init__(self, *handlers):
+        self.queue = queue.Queue()
+        self.handler = QueueHandler(self.queue)
+        self._listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        self._running = True
+        atexit.register(self.close)
+
+    def flush(self):
+        """等后台线程写完队列中已有的记录，再把内容刷到磁盘；不停止后台线程"""
+        if self._running:
+            self.queue.join()  # QueueListener 每处理完一条记录调用一次 task_done
+        for h in self._listener.handlers:
+            h.flush()
+
+    def close(self):
+        """排空队列并停止后台线程"""
+        if self._running:
+            self._running = False
+            self._listener.stop()
+        for h in self._listener.handlers:
+            h.flush()
+
+
 class SessionRecorder:
     def __init__(self):
         # 1. 创建本次会话的专属目录
@@ -40,6 +75,7 @@ class SessionRecorder:
         
         # 防止重复添加 handler
         if logger.handlers:
+            self._log_writer = getattr(logger, "_log_writer", None)
             return logger
 
         # 文件处理器
@@ -54,20 +90,30 @@ class SessionRecorder:
         console_formatter = logging.Formatter('[%(levelname)s] %(message)s')
         console_handler.setFormatter(console_formatter)
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # 文件与控制台写入都交给后台线程，调用方只做入队
+        self._log_writer = AsyncLogWriter(file_handler, console_handler)
+        logger._log_writer = self._log_writer
+        logger.addHandler(self._log_writer.handler)
         return logger
 
-    def log(self, level, message):
-        """通用日志接口"""
+    def flush(self):
+        """等待已入队的日志全部写出"""
+        if self._log_writer is not None:
+            self._log_writer.flush()
+
+    def log(self, level, message, *args):
+        """通用日志接口
+
+        message 可带 %s 占位符并通过 args 传参，只在日志实际输出时才格式化
+        """
         if level.lower() == "info":
-            self.logger.info(message)
+            self.logger.info(message, *args)
         elif level.lower() == "debug":
-            self.logger.debug(message)
+            self.logger.debug(message, *args)
         elif level.lower() == "warning":
-            self.logger.warning(message)
+            self.logger.warning(message, *args)
         elif level.lower() == "error":
-            self.logger.error(message)
+            self.logger.error(message, *args)
     
     # 修改 record_action 方法，如果是评论，额外记录到 comments_log
     def record_action(self, action_type: str, details: str = ""):
@@ -115,4 +161,5 @@ class SessionRecorder:
         
         self.logger.info(f"=== 会话结束 ===")
         self.logger.info(f"统计报告已生成: {report_path.name}")
-        self.logger.info(f"总浏览: {self.stats['notes_viewed']}, 点赞: {self.stats['actions']['like']}, 收藏: {self.stats['actions']['collect']}")
\ No newline at end of file
+        self.logger.info(f"总浏览: {self.stats['notes_viewed']}, 点赞: {self.stats['actions']['like']}, 收藏: {self.stats['actions']['collect']}")
+        self.flush()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import asyncio
+import collections
 import os
 from datetime import datetime
 import random
@@ -7,7 +8,17 @@ from pathlib import Path
 import json
 import traceback
 import aiohttp
+import heapq
 import io
+import mimetypes
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import time
+import subprocess
+import tempfile
+import threading
+import uuid
+from urllib.parse import unquote
 
 import httpx
 try:
@@ -29,13 +40,284 @@ from config.settings import (
     SELECTORS,
     ASR_SERVER_URL
 )
-from core.browser_manager import BrowserManager
+from core.browser_manager import BrowserManager, BrowserPagePool
 from core.llm_client import LLMClient
 from core.human_motion import HumanMotion
 from core.video_downloader import VideoDownloader
+from core.asr_cache import ASRCache, hash_file
 from core.report_renderer import render_deep_research_html
 from rapidocr import RapidOCR
 
+try:
+    import orjson  # 可选依赖：C 实现的 JSON 解析/序列化，长转录文本与大结果文件更快
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持：pip install "httpx[http2]"
+    ASR_HTTP2 = True
+except ImportError:
+    ASR_HTTP2 = False
+
+try:
+    import webrtcvad  # 可选依赖：pip install webrtcvad，用于跳过无人声视频的转录
+except ImportError:
+    webrtcvad = None
+
+UPLOAD_CHUNK_SIZE = 64 * 1024  # ASR 上传分块大小
+ASR_TIMEOUT = 300.0  # 单个视频的 ASR 超时（秒），大文件转录较慢
+ASR_FAILURE_TTL = 300  # 转录失败的文件在该时间（秒）内不再重试
+ASR_ERROR_BODY_LIMIT = 2048  # 错误响应体最多读取/记录的字节数
+ASR_MAX_CONCURRENCY = 4  # 同时在途的 ASR 请求上限，避免压垮 ASR 服务
+ASR_BATCH_SIZE = 8  # 单次批量转录请求最多携带的视频数
+# ASR 只需要音频：上传前抽取单声道 16kHz Opus 音轨，体积通常缩小数十倍
+ASR_AUDIO_ARGS = ["-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg"]
+VIDEO_SUFFIXES = {".mp4", ".mov", ".m4v", ".mkv", ".webm", ".flv"}
+# 过大的上传：音轨超过阈值时切段并发转录；没能抽取音轨的原视频超过上限时直接跳过
+ASR_SEGMENT_THRESHOLD_BYTES = 4 * 1024 * 1024  # 24kbps Opus 约 20 分钟
+ASR_SEGMENT_SECONDS = 120
+ASR_MAX_UPLOAD_BYTES = 100 * 1024 * 1024  # 与 ASR 服务默认的 MAX_FILE_SIZE_MB 一致
+OCR_MAX_WORKERS = min(4, os.cpu_count() or 1)  # 并发 OCR 线程数上限，不超过 CPU 核数，避免多个详情页同时 OCR 时争抢 CPU
+# 使用 int8 动态量化的检测/识别模型：CPU 推理更快、内存更省，但识别精度可能略降，默认关闭
+OCR_INT8_MODELS = False
+OCR_MODEL_CACHE_DIR = DEEP_RESEARCH_OUTPUT_DIR.parent / "models"  # 量化模型缓存目录
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_MS = 30
+VAD_MIN_SPEECH_SECONDS = 0.5  # 人声总时长低于该值时不送 ASR
+# 详情页内容容器：搜索页弹出的详情遮罩与直接打开的详情页中都存在
+DETAIL_ROOT_SELECTOR = "#noteContainer"
+DETAIL_PAGE_POOL_SIZE = 3  # 同时打开的详情页标签数
+# 研究期间搜索结果页屏蔽的资源类型（样式表保留，瀑布流布局与懒加载依赖它）
+SEARCH_BLOCKED_RESOURCE_TYPES = {"font", "media", "image"}
+COMMENT_ITEM_SELECTOR = "#noteContainer .parent-comment"
+COMMENT_SCROLL_MAX_ROUNDS = 3  # 评论区最多滚动轮数
+COMMENT_LOAD_TIMEOUT_MS = 1500  # 每轮滚动后等待新评论出现的最长时间
+_NOTE_ID_RE = re.compile(r'/(?:explore|search_result)/([a-f0-9]+)')
+# 报告后处理：LLM 常见的引用写法
+_RE_CITE_BACKTICK = re.compile(r"`\s*(见\s*\[帖子\[(\d+)\]\][^`]*)\s*`")
+# 见[帖子[N]] 与裸 [帖子[N]] 合为一次扫描；已是 Markdown 链接（]后紧跟(）的不匹配
+_RE_CITE = re.compile(r"(见\s*)?\[帖子\[(\d+)\]\](?!\()")
+_RE_REF_LINK = re.compile(r"链接\((https?://[^\s)]+)\)")
+# 提示词统计：中文连续串近似短语
+_TERM_RE = re.compile(r"[\u4e00-\u9fff]{2,6}")
+_TERM_STOPWORDS = frozenset({
+    "这个", "一个", "我们", "你们", "他们", "就是", "因为", "所以", "但是", "然后", "真的", "感觉", "比较",
+    "如果", "还是", "可以", "不是", "没有", "很多", "特别", "以及", "一些", "这种", "那种", "怎么", "为什么",
+    "时候", "现在", "已经", "不会", "可能", "需要", "觉得", "问题", "内容", "评论", "帖子", "小红书", "春晚",
+})
+# 详情页发布日期的候选选择器（容错，按顺序尝试）
+PUBLISH_DATE_SELECTORS = [".bottom-container .date", ".notedetail-menu + .date", "[class*=\"bottom\"] .date"]
+
+
+def _guess_mime(path: Path) -> str:
+    """按扩展名推断上传文件的 MIME（如 .mp4 -> video/mp4），未知类型回退为二进制流"""
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def _is_ascii_number(text: str) -> bool:
+    """是否为形如 12 或 12.5 的非负十进制数"""
+    whole, dot, frac = text.partition(".")
+    return all(p.isascii() and p.isdigit() for p in ((whole, frac) if dot else (whole,)))
+
+
+def _parse_bar_line(line: str) -> tuple[str, float] | None:
+    """
+    解析非标准 mermaid bar 图的数据行：bar "A": 10
+
+    按最后一个冒号切分，标签两侧的引号可选；格式不符返回 None
+    """
+    if len(line) < 4 or not line.startswith("bar") or not line[3].isspace():
+        return None
+    label, sep, value = line[3:].lstrip().rpartition(":")
+    value = value.strip()
+    if not sep or not _is_ascii_number(value):
+        return None
+    if label.startswith('"'):
+        label = label[1:]
+    label = label.rstrip()
+    if label.endswith('"'):
+        label = label[:-1]
+    return label, float(value)
+
+
+# 报告/提示词构建用的帖子视图：字段只取值并 strip 一次，列表字段保证为 list
+PostView = collections.namedtuple(
+    "PostView", "url title author publish_date content asr ocr comments video_url image_urls"
+)
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _post_view(post: dict) -> PostView:
+    """把抓取到的帖子 dict 规整为 PostView"""
+    get = post.get
+    return PostView(
+        url=(get("url") or "").strip(),
+        title=(get("title") or "").strip(),
+        author=(get("author") or "").strip(),
+        publish_date=(get("publish_date") or "").strip(),
+        content=(get("content") or "").strip(),
+        asr=(get("asr_results") or "").strip(),
+        ocr=_as_list(get("ocr_results")),
+        comments=_as_list(get("comments")),
+        video_url=(get("video_url") or "").strip(),
+        image_urls=_as_list(get("image_urls")),
+    )
+
+
+def _write_text(path: Path, text: str):
+    """同步写文本文件（供 asyncio.to_thread 调用）"""
+    path.write_text(text, encoding="utf-8")
+
+
+def _build_multipart(fields: dict, files: list[tuple[str, Path, str]]):
+    """
+    构建流式 multipart/form-data 请求体，文件内容按块读取，不整体载入内存
+
+    Args:
+        fields: 普通表单字段
+        files: (字段名, 文件路径, MIME) 列表
+
+    Returns:
+        (异步生成器, 请求头)；请求头带 Content-Length，避免 chunked 传输
+    """
+    boundary = uuid.uuid4().hex
+    head = "".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        for name, value in fields.items()
+    ).encode("utf-8")
+    parts = [
+        (
+            (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{path.name}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode("utf-8"),
+            path,
+        )
+        for field, path, content_type in files
+    ]
+    tail = f"--{boundary}--\r\n".encode("utf-8")
+    length = len(head) + len(tail) + sum(len(part_head) + path.stat().st_size + 2 for part_head, path in parts)
+
+    async def body():
+        yield head
+        for part_head, path in parts:
+            yield part_head
+            # 磁盘读放到线程里，慢盘/大文件时不阻塞事件循环
+            f = await asyncio.to_thread(open, path, "rb")
+            try:
+                while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                f.close()
+            yield b"\r\n"
+        yield tail
+
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        "Content-Length": str(length),
+    }
+    return body(), headers
+
+
+async def _asr_http_error(response: httpx.Response) -> httpx.HTTPStatusError:
+    """
+    只读取错误响应体的前 ASR_ERROR_BODY_LIMIT 字节，构造 HTTPStatusError
+
+    异常消息即截断后的响应体，调用方直接记录异常，不再访问 response.text
+    """
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) >= ASR_ERROR_BODY_LIMIT:
+            break
+    snippet = bytes(body[:ASR_ERROR_BODY_LIMIT]).decode("utf-8", errors="replace")
+    return httpx.HTTPStatusError(snippet, request=response.request, response=response)
+
+
+_ocr_engine = None
+_ocr_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> RapidOCR:
+    """
+    进程内共享的 RapidOCR 引擎（懒加载单例）
+
+    创建 ONNX 会话开销较大，多个 ResearchAgent 先后运行时复用同一个已预热的引擎
+    """
+    global _ocr_engine
+    with _ocr_engine_lock:
+        if _ocr_engine is None:
+            params = _quantized_ocr_params() if OCR_INT8_MODELS else {}
+            try:
+                _ocr_engine = RapidOCR(params=params) if params else RapidOCR()
+            except Exception:
+                _ocr_engine = RapidOCR()  # 量化模型不可用时回退到默认 FP32 模型
+            _warm_up_ocr_engine(_ocr_engine)
+        return _ocr_engine
+
+
+def _quantized_ocr_params() -> dict:
+    """
+    把 RapidOCR 自带的检测/识别模型动态量化为 int8 并缓存到 OCR_MODEL_CACHE_DIR
+
+    Returns:
+        RapidOCR 构造参数；缺少 onnxruntime.quantization 或量化失败时返回空字典
+    """
+    try:
+        import rapidocr
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError:
+        return {}
+
+    model_dir = Path(rapidocr.__file__).parent / "models"
+    params = {}
+    for key, pattern in (("Det.model_path", "*det*.onnx"), ("Rec.model_path", "*rec*.onnx")):
+        src = next(iter(sorted(model_dir.glob(pattern))), None)
+        if src is None:
+            continue
+        dst = OCR_MODEL_CACHE_DIR / f"{src.stem}.int8.onnx"
+        if not dst.exists():
+            OCR_MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = dst.with_name(dst.name + ".part")
+            try:
+                quantize_dynamic(src, tmp, weight_type=QuantType.QUInt8)
+                os.replace(tmp, dst)
+            except Exception:
+                tmp.unlink(missing_ok=True)
+                continue
+        params[key] = str(dst)
+    return params
+
+
+def _warm_up_ocr_engine(engine: RapidOCR):
+    """用一张小黑图跑一次推理，让 ONNX 会话与线程池在第一张真实图片前就绪"""
+    import numpy as np
+
+    try:
+        engine(np.zeros((32, 32, 3), dtype=np.uint8))
+    except Exception:
+        pass
+
+
+def _contains_speech(pcm: bytes) -> bool:
+    """对 16kHz 单声道 s16le PCM 做 VAD，人声累计达到阈值即返回 True"""
+    vad = webrtcvad.Vad(2)
+    frame_bytes = VAD_SAMPLE_RATE * VAD_FRAME_MS // 1000 * 2
+    needed_frames = VAD_MIN_SPEECH_SECONDS * 1000 / VAD_FRAME_MS
+    speech_frames = 0
+    for i in range(0, len(pcm) - frame_bytes + 1, frame_bytes):
+        if vad.is_speech(pcm[i:i + frame_bytes], VAD_SAMPLE_RATE):
+            speech_frames += 1
+            if speech_frames >= needed_frames:
+                return True
+    return False
+
+
 class ResearchAgent:
     def __init__(self, browser_manager: BrowserManager, llm_client: LLMClient, recorder):
         self.browser_manager = browser_manager
@@ -43,6 +325,13 @@ class ResearchAgent:
         self.page = browser_manager.page
         self.recorder = recorder  # 统一使用 recorder 日志系统
         self.human = HumanMotion(self.page)
+        self._rng = random.Random()  # 实例独享的随机数生成器，停顿/抖动不与其它线程争用全局 random
+        self._asr_client: httpx.AsyncClient | None = None  # 复用连接，首次转录时创建
+        self._http_session: aiohttp.ClientSession | None = None  # 图片下载共用的连接池，首次下载时创建
+        self._asr_sem = asyncio.Semaphore(ASR_MAX_CONCURRENCY)
+        self._page_pool: BrowserPagePool | None = None  # 详情页标签页池，首次研究时创建
+        # 转录失败记录：(路径, mtime_ns, 大小) -> 失败时刻，文件变化后自动失效
+        self._asr_neg_cache: dict[tuple, float] = {}
 
         if not DEEP_RESEARCH_ENABLED:
             self.recorder.log("info", "深度研究模式未启用")
@@ -54,9 +343,13 @@ class ResearchAgent:
 
         self.video_downloader = VideoDownloader(save_dir=self.output_dir / "videos")
         self.visited_note_ids = set()  # 新增：已访问帖子ID集合
+        # ASR 结果缓存：跨运行共享，按视频内容哈希命中
+        self._asr_cache = ASRCache(DEEP_RESEARCH_OUTPUT_DIR / "asr_cache.json")
         self.ocr_engine = None
+        self._ocr_cache: dict[str, list[str]] = {}  # 图片 URL -> OCR 文本
+        self._ocr_executor: ThreadPoolExecutor | None = None  # 首次 OCR 时创建
         if DEEP_RESEARCH_ENABLED:
-            self.ocr_engine = RapidOCR()
+            self.ocr_engine = get_ocr_engine()
             self.recorder.log("info", "🧠 OCR 引擎已加载")
 
     async def run_deep_research(self, keyword: str = None):
@@ -64,147 +357,184 @@ class ResearchAgent:
             self.recorder.log("info", "Deep research mode is disabled. Skipping run.")
             return
 
+        # 研究期间搜索结果页只用来发现帖子链接，不需要字体、视频和缩略图；
+        # 路由只装在 self.page 上，标签页池中的详情页不受影响
+        await self.page.route("**/*", self._block_search_resources)
+        try:
+            await self._run_deep_research(keyword)
+        finally:
+            try:
+                await self.page.unroute("**/*", self._block_search_resources)
+            except Exception as e:
+                self.recorder.log("debug", f"取消资源拦截失败: {e}")
+            await self.aclose()
+
+    async def _block_search_resources(self, route):
+        """丢弃搜索结果页上不影响帖子发现的资源请求"""
+        if route.request.resource_type in SEARCH_BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def aclose(self):
+        """释放网络资源、详情页标签与 OCR 线程池（下次使用时会重新创建）"""
+        if self._page_pool is not None:
+            await self._page_pool.close()
+            self._page_pool = None
+        if self._asr_client is not None:
+            await self._asr_client.aclose()
+            self._asr_client = None
+        if self._http_session is not None:
+            await self._http_session.close()
+            self._http_session = None
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=False)
+            self._ocr_executor = None
+        # ASR 缓存的写入是合并落盘的，收尾时把剩余的写回去
+        await asyncio.to_thread(self._asr_cache.flush)
+
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """返回共享的图片下载会话，同一 CDN 的多张图片复用 keep-alive 连接"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=16, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self._http_session
+
+    def _get_asr_client(self) -> httpx.AsyncClient:
+        """返回共享的 ASR HTTP 客户端，保持长连接，避免每次转录重新握手"""
+        if self._asr_client is None:
+            # HTTP/2 可在一条连接上复用并发上传；服务端不支持时自动协商回 HTTP/1.1
+            self._asr_client = httpx.AsyncClient(
+                timeout=ASR_TIMEOUT,
+                http2=ASR_HTTP2,
+                limits=httpx.Limits(
+                    max_keepalive_connections=ASR_MAX_CONCURRENCY,
+                    max_connections=ASR_MAX_CONCURRENCY,
+                ),
+            )
+        return self._asr_client
+
+    def _get_ocr_executor(self) -> ThreadPoolExecutor:
+        """返回 OCR 专用线程池（aclose 时关闭，下次使用时重新创建）"""
+        if self._ocr_executor is None:
+            self._ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr")
+        return self._ocr_executor
+
+    async def _warmup_asr(self):
+        """请求 /health 提前完成 DNS 解析与建连，供随后的上传复用；失败无影响"""
+        health_url = ASR_SERVER_URL.rsplit("/", 1)[0] + "/health"
+        try:
+            await self._get_asr_client().get(health_url, timeout=5.0)
+        except Exception as e:
+            self.recorder.log("debug", "ASR warmup failed: %s", e)
+
+    async def _run_deep_research(self, keyword: str = None):
         self.recorder.log("info", f"📚 [深度研究] 开始深度研究: {keyword if keyword else 'configured keywords'}")
 
-        search_term = keyword if keyword else random.choice(SEARCH_KEYWORDS)
+        search_term = keyword if keyword else self._rng.choice(SEARCH_KEYWORDS)
 
         # 执行搜索
         await self._perform_search(search_term)
 
-        # 模拟真实用户浏览行为：逐个点击帖子
+        # 搜索结果页只负责发现帖子，详情页在标签页池中并发打开与抓取
         research_data = []
-        posts_processed = 0
         attempts = 0  # 尝试次数计数器
+        queue: asyncio.Queue = asyncio.Queue(maxsize=DETAIL_PAGE_POOL_SIZE)
+        if self._page_pool is None:
+            self._page_pool = BrowserPagePool(self.browser_manager.context, DETAIL_PAGE_POOL_SIZE)
+
+        # 视频转录与后续帖子的抓取重叠进行：上一批转录在途时新视频先攒着，
+        # 转录空闲或攒满 ASR_BATCH_SIZE 个再发出一批
+        asr_batches: list[tuple[list[dict], asyncio.Task]] = []
+        pending_videos: list[dict] = []
+
+        def flush_videos():
+            if pending_videos:
+                posts = pending_videos[:]
+                pending_videos.clear()
+                task = asyncio.create_task(
+                    self._transcribe_videos_batch([Path(p["video_local_path"]) for p in posts])
+                )
+                asr_batches.append((posts, task))
+
+        async def worker():
+            nonlocal attempts
+            while (item := await queue.get()) is not None:
+                if len(research_data) >= DEEP_RESEARCH_POST_LIMIT:
+                    continue  # 已收集够，丢弃队列中剩余的帖子
+                note_id, note_url = item
+                attempts += 1
+                self.recorder.log("info", f"👆 [深度研究] 打开第 {attempts} 个帖子 | 已收集: {len(research_data)}/{DEEP_RESEARCH_POST_LIMIT} (ID: {note_id[:8]}...)")
+                try:
+                    async with self._page_pool.page() as page:
+                        post_data = await self._open_and_extract(page, note_url)
+                except Exception as e:
+                    self.recorder.log("warning", f"⚠️ [深度研究] 帖子 {note_id[:8]}... 抓取异常: {e}")
+                    continue
+                if post_data is None:
+                    continue
 
-        while posts_processed < DEEP_RESEARCH_POST_LIMIT:
-            # 1. 检查环境
-            if "xiaohongshu.com" not in self.page.url or "search_result" not in self.page.url:
-                self.recorder.log("error", f"❌ [深度研究] 环境偏离: {self.page.url}")
-                break
-
-            # 2. 寻找视口内的帖子
-            notes = await self.page.locator(SELECTORS["note_card"]).all()
-            if not notes:
-                self.recorder.log("warning", "📍 [深度研究] 视口无帖子，滚动寻找...")
-                await self.human.human_scroll(500)
-                await asyncio.sleep(2)
-                notes = await self.page.locator(SELECTORS["note_card"]).all()
-                if not notes:
-                    self.recorder.log("error", "❌ [深度研究] 未检测到笔记，结束研究")
-                    break
-
-            # 3. 防御性检查：确保没有遮罩层存在（避免上次关闭失败）
-            try:
-                mask_visible = await self.page.locator(SELECTORS["note_detail_mask"]).is_visible()
-                if mask_visible:
-                    self.recorder.log("warning", "⚠️ 检测到残留遮罩层，强制关闭...")
-                    await self.page.keyboard.press("Escape")
-                    await self.page.wait_for_selector(
-                        SELECTORS["note_detail_mask"],
-                        state="hidden",
-                        timeout=3000
-                    )
-                    await asyncio.sleep(0.5)
-            except Exception as e:
-                self.recorder.log("debug", f"遮罩层检查: {e}")
-
-            # 4. 选择一个帖子并点击（研究模式：加速浏览）
-            target_note = random.choice(notes[:6])  # 从前6个中随机选择
-            await target_note.scroll_into_view_if_needed()
-            await asyncio.sleep(random.uniform(0.3, 0.5))  # 减半延迟
-
-            # 提前获取 note_id 用于日志（从子元素 <a> 标签获取 href）
-            note_id_preview = "unknown"
-            try:
-                # 正确获取：先定位所有 <a> 标签，然后取第一个的 href
-                note_links = target_note.locator('a[href*="/explore/"]')
-                if await note_links.count() > 0:
-                    note_href = await note_links.first.get_attribute('href') or ""
-                    if note_href:
-                        note_id_preview = self._extract_note_id_from_url(note_href)[:8] or "unknown"
-            except Exception as e:
-                self.recorder.log("debug", f"获取 note_id 失败: {e}")
-
-            attempts += 1
-            self.recorder.log("info", f"👆 [深度研究] 点击第 {attempts} 个帖子 | 已收集: {posts_processed}/{DEEP_RESEARCH_POST_LIMIT} (ID: {note_id_preview}...)")
-            await target_note.click()
-
-            # 5. 等待详情页加载，并尝试从URL获取ID
-            try:
-                await self.page.wait_for_selector(SELECTORS["note_detail_mask"], timeout=5000)
-                # 如果之前没获取到ID，尝试从当前页面URL获取
-                if note_id_preview == "unknown":
-                    current_url = self.page.url
-                    note_id_from_url = self._extract_note_id_from_url(current_url)
-                    if note_id_from_url:
-                        note_id_preview = note_id_from_url[:8]
-            except:
-                self.recorder.log("warning", "⏱️ [深度研究] 详情页加载超时，跳过此帖")
-                await self.page.keyboard.press("Escape")
-                continue
-
-            # 6. 提取帖子内容（不调用 LLM，仅提取数据）
-            post_data = await self._extract_content_from_page()
-
-            # 判断帖子是否有价值：文字、图片、视频、评论任一存在即可收集
-            # 纯图片帖子、有评论的帖子都是有价值的内容！
-            has_value = False
-            if post_data:
+                # 判断帖子是否有价值：文字、图片、视频、评论任一存在即可收集
+                # 纯图片帖子、有评论的帖子都是有价值的内容！
                 has_value = bool(
                     post_data.get("content") or          # 有文字内容
                     post_data.get("image_urls") or       # 有图片
                     post_data.get("video_url") or        # 有视频
                     post_data.get("comments")            # 有评论
                 )
-
-            if has_value:
-                research_data.append(post_data)
-                posts_processed += 1
-                note_id = self._extract_note_id_from_url(post_data.get('url', ''))
-                self.recorder.log("info", f"✅ [深度研究] 已收集 {posts_processed}/{DEEP_RESEARCH_POST_LIMIT} 个帖子 (ID: {note_id[:8] if note_id else 'unknown'}...)")
-            else:
-                # 记录跳过原因
-                skip_reason = "无数据" if not post_data else "完全无内容（无文字、图片、视频、评论）"
-                self.recorder.log("warning", f"⚠️ [深度研究] 跳过帖子: {skip_reason} (尝试 {attempts})")
-
-            # 7. 关闭详情页，返回搜索结果页（研究模式：快速关闭）
-            await asyncio.sleep(random.uniform(0.5, 0.8))  # 减半延迟
-            if await self.human.click_element(SELECTORS["btn_close"], "关闭详情"):
-                self.recorder.log("debug", "使用按钮关闭详情页")
-            else:
-                await self.page.keyboard.press("Escape")
-                self.recorder.log("debug", "使用 Escape 关闭详情页")
-
-            # 8. 等待遮罩层完全消失，避免拦截下一次点击
+                if not has_value:
+                    self.recorder.log("warning", f"⚠️ [深度研究] 跳过帖子: 完全无内容（无文字、图片、视频、评论） (ID: {note_id[:8]}...)")
+                elif len(research_data) < DEEP_RESEARCH_POST_LIMIT:
+                    research_data.append(post_data)
+                    self.recorder.log("info", f"✅ [深度研究] 已收集 {len(research_data)}/{DEEP_RESEARCH_POST_LIMIT} 个帖子 (ID: {note_id[:8]}...)")
+                    if post_data.get("video_local_path") and os.path.exists(post_data["video_local_path"]):
+                        pending_videos.append(post_data)
+                        if len(pending_videos) >= ASR_BATCH_SIZE or not asr_batches or asr_batches[-1][1].done():
+                            flush_videos()
+                await asyncio.sleep(self._rng.uniform(0.5, 0.8))
+
+        workers = [asyncio.create_task(worker()) for _ in range(DETAIL_PAGE_POOL_SIZE)]
+        try:
             try:
-                await self.page.wait_for_selector(
-                    SELECTORS["note_detail_mask"],
-                    state="hidden",
-                    timeout=5000
-                )
-                self.recorder.log("debug", "✅ 遮罩层已消失")
-            except Exception as e:
-                self.recorder.log("warning", f"⚠️ 等待遮罩层消失超时: {e}")
-                # 如果遮罩层仍然存在，强制等待更长时间
-                await asyncio.sleep(1.0)
-
-            # 9. 如果还需要更多帖子，偶尔滚动页面加载新内容
-            if posts_processed < DEEP_RESEARCH_POST_LIMIT and posts_processed % 3 == 0:
-                self.recorder.log("info", "📜 [深度研究] 滚动加载更多帖子...")
-                await self.human.human_scroll(random.randint(800, 1200))
-                await asyncio.sleep(random.uniform(1.0, 1.5))  # 减半延迟
+                await self._enqueue_unvisited_notes(queue, research_data)
+            finally:
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+
+            # 等待剩余视频转录完成：一次请求携带多个视频，减少连接与请求开销
+            flush_videos()
+            if asr_batches:
+                self.recorder.log("info", f"⏳ [深度研究] 等待 {len(asr_batches)} 批视频转录完成...")
+                for posts, task in asr_batches:
+                    try:
+                        transcripts = await task
+                    except Exception as e:
+                        # 一批转录失败只影响这批帖子，已抓取的数据照常保存
+                        self.recorder.log("error", "ASR batch failed for %s posts: %s", len(posts), e)
+                        transcripts = {}
+                    for p in posts:
+                        p["asr_results"] = transcripts.get(str(Path(p["video_local_path"])), "")
+        finally:
+            # 抓取中途出错时，尚未完成的转录任务不再需要
+            for _, task in asr_batches:
+                if not task.done():
+                    task.cancel()
 
         # 保存研究数据
         if research_data:
             data_filename = self.output_dir / f"research_data_{search_term}.json"
-            with open(data_filename, "w", encoding="utf-8") as f:
-                serializable_data = []
-                for item in research_data:
-                    serializable_item = item.copy()
-                    if 'video_local_path' in serializable_item and isinstance(serializable_item['video_local_path'], Path):
-                        serializable_item['video_local_path'] = str(serializable_item['video_local_path'])
-                    serializable_data.append(serializable_item)
-                json.dump(serializable_data, f, ensure_ascii=False, indent=4)
+            # default=str 在序列化时把 Path 等对象转为字符串，无需预先复制每条数据
+            if orjson is not None:
+                with open(data_filename, "wb") as f:
+                    f.write(orjson.dumps(
+                        research_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str
+                    ))
+            else:
+                with open(data_filename, "w", encoding="utf-8") as f:
+                    json.dump(research_data, f, ensure_ascii=False, indent=4, default=str)
             self.recorder.log("info", f"💾 [深度研究] 原始数据已保存: {data_filename}")
 
             report = await self._generate_report(research_data)
@@ -227,12 +557,12 @@ class ResearchAgent:
 
             # 2. 点击搜索框
             await self.human.click_element(SELECTORS["search_input"], "搜索框")
-            await asyncio.sleep(random.uniform(0.5, 1.0))
+            await asyncio.sleep(self._rng.uniform(0.5, 1.0))
 
             # 3. 清空并输入关键词
             await self.page.locator(SELECTORS["search_input"]).clear()
             for char in keyword:
-                await self.page.keyboard.type(char, delay=random.randint(50, 150))
+                await self.page.keyboard.type(char, delay=self._rng.randint(50, 150))
 
             # 4. 提交搜索
             self.recorder.log("info", f"🔍 [搜索] 提交搜索: '{keyword}'")
@@ -257,42 +587,357 @@ class ResearchAgent:
             return ""
 
         if not video_local_path.exists():
-            self.recorder.log("warning", f"Video file not found for transcription: {video_local_path}")
+            self.recorder.log("warning", "Video file not found for transcription: %s", video_local_path)
+            return ""
+
+        if self._asr_recently_failed(video_local_path):
             return ""
 
-        self.recorder.log("info", f"Sending {video_local_path.name} to ASR server for transcription (language=zh)...")
+        # 按内容哈希查缓存，命中则跳过上传与转录
+        digest, cached = await self._asr_cache_lookup(video_local_path)
+        if cached is not None:
+            return cached
+
+        upload_path, content_type = await self._prepare_asr_upload(video_local_path)
+        if not await self._has_speech(video_local_path, upload_path):
+            return ""
+        return await self._transcribe_prepared(video_local_path, digest, upload_path, content_type)
+
+    async def _transcribe_prepared(
+        self, video_local_path: Path, digest: str | None, upload_path: Path, content_type: str
+    ) -> str:
+        """上传已准备好的音频（过大的音轨先切段并发转录），成功后写入缓存"""
+        upload_size = upload_path.stat().st_size
+        if upload_path == video_local_path and upload_size > ASR_MAX_UPLOAD_BYTES:
+            # 没能抽取音轨又无法切分的大文件，上传注定超时，直接放弃
+            self.recorder.log(
+                "warning",
+                "ASR skipped for %s: %.0fMB exceeds upload limit",
+                video_local_path.name, upload_size / 1024 / 1024,
+            )
+            self._mark_asr_failed(video_local_path)
+            return ""
+
+        self.recorder.log("info", "Sending %s to ASR server for transcription (language=zh)...", video_local_path.name)
         try:
-            async with httpx.AsyncClient(timeout=300.0) as client: # Increased timeout for large files
-                with open(video_local_path, "rb") as f:
-                    files = {'file': (video_local_path.name, f, 'audio/mpeg')}
-                    data = {'language': 'zh', 'task': 'transcribe'}  # 强制使用中文
-                    response = await client.post(ASR_SERVER_URL, files=files, data=data)
-                response.raise_for_status() # Raise an exception for HTTP errors
-                
-                result = response.json()
-                transcription = result.get("text", "")
-                if transcription:
-                    self.recorder.log("info", f"ASR successful for {video_local_path.name}: {transcription[:50]}...")
-                else:
-                    self.recorder.log("warning", f"ASR returned empty transcription for {video_local_path.name}.")
-                return transcription
+            if upload_path != video_local_path and upload_size > ASR_SEGMENT_THRESHOLD_BYTES:
+                transcription = await self._transcribe_in_segments(upload_path)
+            else:
+                transcription = await self._post_asr_file(upload_path, content_type)
+            if transcription:
+                self.recorder.log("info", "ASR successful for %s: %s...", video_local_path.name, transcription[:50])
+                if digest:
+                    await self._asr_cache_store(digest, transcription)
+            else:
+                self.recorder.log("warning", "ASR returned empty transcription for %s.", video_local_path.name)
+            return transcription
         except httpx.RequestError as exc:
-            self.recorder.log("error", f"ASR request error for {video_local_path.name}: {exc}")
+            self.recorder.log("error", "ASR request error for %s: %s", video_local_path.name, exc)
         except httpx.HTTPStatusError as exc:
-            self.recorder.log("error", f"ASR HTTP error for {video_local_path.name} - {exc.response.status_code}: {exc.response.text}")
+            self.recorder.log("error", "ASR HTTP error for %s - %s: %s", video_local_path.name, exc.response.status_code, exc)
         except Exception as e:
-            self.recorder.log("error", f"Unexpected error during ASR for {video_local_path.name}: {e}")
+            self.recorder.log("error", "Unexpected error during ASR for %s: %s", video_local_path.name, e)
+        self._mark_asr_failed(video_local_path)
         return ""
 
+    async def _post_asr_file(self, upload_path: Path, content_type: str) -> str:
+        """把单个音频文件发往 ASR 服务并返回转录文本；HTTP 错误以异常抛出"""
+        client = self._get_asr_client()
+        # 流式上传：边读盘边发送，内存占用与文件大小无关
+        data = {'language': 'zh', 'task': 'transcribe'}  # 强制使用中文
+        body, headers = _build_multipart(data, [('file', upload_path, content_type)])
+        # 优先请求 NDJSON 分段流，边收边解析，不必缓冲整个响应
+        headers["Accept"] = "application/x-ndjson, application/json"
+        # 上传内容的 SHA-256：服务端据此校验并命中自己的转录缓存（上传的是音轨，体积小，哈希很快）
+        headers["X-Content-SHA256"] = await asyncio.to_thread(hash_file, upload_path, "sha256")
+        async with self._asr_sem:
+            async with client.stream("POST", ASR_SERVER_URL, content=body, headers=headers) as response:
+                self.recorder.log("debug", "ASR response for %s via %s", upload_path.name, response.http_version)
+                if response.status_code >= 400:
+                    raise await _asr_http_error(response)
+
+                if response.headers.get("content-type", "").startswith("application/x-ndjson"):
+                    return await self._read_ndjson_transcript(response)
+                # 旧版服务端不支持流式，一次性返回 JSON
+                result = _json_loads(await response.aread())
+                return result.get("text", "")
+
+    async def _transcribe_in_segments(self, audio_path: Path) -> str:
+        """
+        长音频按 ASR_SEGMENT_SECONDS 切段后并发转录，再按顺序拼接
+
+        单段转录时间可控，不会撞上服务端单次转录的超时
+        """
+        seg_dir = Path(tempfile.mkdtemp(prefix=f"{audio_path.stem}_", dir=audio_path.parent))
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-loglevel", "error", "-i", str(audio_path),
+                "-f", "segment", "-segment_time", str(ASR_SEGMENT_SECONDS), "-c", "copy",
+                str(seg_dir / f"seg_%04d{audio_path.suffix}"),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            if await proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg segmenting failed for {audio_path.name}")
+            segments = sorted(seg_dir.iterdir())
+            self.recorder.log("info", "Transcribing %s in %s segments", audio_path.name, len(segments))
+            texts = await asyncio.gather(*(self._post_asr_file(seg, "audio/ogg") for seg in segments))
+            return " ".join(text for text in texts if text)
+        finally:
+            shutil.rmtree(seg_dir, ignore_errors=True)
+
+    @staticmethod
+    async def _read_ndjson_transcript(response: httpx.Response) -> str:
+        """逐行解析 ASR 服务返回的 NDJSON 分段（{"segment": ...}），遇到 {"error": ...} 抛出异常"""
+        segments = []
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            item = _json_loads(line)
+            if "error" in item:
+                raise RuntimeError(item["error"])
+            if "segment" in item:
+                segments.append(item["segment"])
+        return " ".join(segments)
+
+    @staticmethod
+    def _asr_file_key(video_local_path: Path) -> tuple:
+        st = video_local_path.stat()
+        return (str(video_local_path), st.st_mtime_ns, st.st_size)
+
+    def _asr_recently_failed(self, video_local_path: Path) -> bool:
+        """文件在 ASR_FAILURE_TTL 内转录失败过则返回 True，避免反复上传注定失败的文件"""
+        key = self._asr_file_key(video_local_path)
+        failed_at = self._asr_neg_cache.get(key)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at >= ASR_FAILURE_TTL:
+            del self._asr_neg_cache[key]
+            return False
+        self.recorder.log("info", "ASR skipped for %s: failed recently", video_local_path.name)
+        return True
+
+    def _mark_asr_failed(self, video_local_path: Path):
+        try:
+            self._asr_neg_cache[self._asr_file_key(video_local_path)] = time.monotonic()
+        except OSError:
+            pass
+
+    async def _prepare_asr_upload(self, video_local_path: Path) -> tuple[Path, str]:
+        """
+        抽取视频音轨用于 ASR 上传，转码结果缓存在源文件旁（重试时直接复用）
+
+        Returns:
+            (上传文件路径, MIME)；ffmpeg 不可用或转码失败时返回原文件
+        """
+        if video_local_path.suffix.lower() not in VIDEO_SUFFIXES:
+            return video_local_path, _guess_mime(video_local_path)
+
+        audio_path = video_local_path.with_name(f"{video_local_path.stem}.asr.ogg")
+        if audio_path.exists() and audio_path.stat().st_mtime >= video_local_path.stat().st_mtime:
+            return audio_path, "audio/ogg"
+
+        if shutil.which("ffmpeg") is None:
+            return video_local_path, _guess_mime(video_local_path)
+
+        # 先写临时文件再改名，避免中断后留下半截音频被当作缓存
+        tmp_path = audio_path.with_name(audio_path.name + ".part")
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-y", "-loglevel", "error", "-i", str(video_local_path),
+                *ASR_AUDIO_ARGS, str(tmp_path),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            returncode = await proc.wait()
+        except OSError as e:
+            self.recorder.log("warning", "ffmpeg failed to start for %s: %s", video_local_path.name, e)
+            returncode = -1
+
+        if returncode != 0 or not tmp_path.exists() or tmp_path.stat().st_size == 0:
+            self.recorder.log("warning", "Audio extraction failed for %s, uploading original file", video_local_path.name)
+            tmp_path.unlink(missing_ok=True)
+            return video_local_path, _guess_mime(video_local_path)
+
+        os.replace(tmp_path, audio_path)
+        self.recorder.log(
+            "debug",
+            "Extracted audio for ASR: %.1fMB -> %.1fMB",
+            video_local_path.stat().st_size / 1024 / 1024,
+            audio_path.stat().st_size / 1024 / 1024,
+        )
+        return audio_path, "audio/ogg"
+
+    async def _has_speech(self, video_local_path: Path, upload_path: Path) -> bool:
+        """
+        本地 VAD 预检，过滤纯音乐、静音片头等无人声视频
+
+        只对已抽取的音轨做检测（解码代价小）；webrtcvad 未安装或解码失败时一律视为有人声
+        """
+        if webrtcvad is None or upload_path == video_local_path:
+            return True
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-loglevel", "error", "-i", str(upload_path),
+                "-f", "s16le", "-ac", "1", "-ar", str(VAD_SAMPLE_RATE), "-",
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+            pcm, _ = await proc.communicate()
+        except OSError:
+            return True
+        if proc.returncode != 0:
+            return True
+        if await asyncio.to_thread(_contains_speech, pcm):
+            return True
+        self.recorder.log("info", "ASR skipped for %s: no speech detected", video_local_path.name)
+        return False
+
+    async def _asr_cache_lookup(self, video_local_path: Path) -> tuple[str | None, str | None]:
+        """计算视频内容哈希并查询 ASR 缓存（哈希在线程中计算，不阻塞事件循环）
+
+        Returns:
+            (digest, 缓存的转录文本)；未命中时文本为 None，哈希失败时 digest 为 None
+        """
+        try:
+            digest = await asyncio.to_thread(hash_file, video_local_path)
+        except OSError as e:
+            self.recorder.log("warning", "Failed to hash %s for ASR cache: %s", video_local_path.name, e)
+            return None, None
+        cached = self._asr_cache.get(digest)
+        if cached is not None:
+            self.recorder.log("info", "ASR cache hit for %s", video_local_path.name)
+        return digest, cached
+
+    async def _asr_cache_store(self, digest: str, transcription: str):
+        """写入 ASR 缓存；缓存写失败只记日志，不影响已拿到的转录结果"""
+        try:
+            await asyncio.to_thread(self._asr_cache.set, digest, transcription)
+        except Exception as e:
+            self.recorder.log("warning", "Failed to cache ASR result %s: %s", digest[:12], e)
+
+    async def _transcribe_videos_batch(self, video_paths: list[Path]) -> dict[str, str]:
+        """批量转录多个视频
+
+        缓存命中的直接返回，其余每 ASR_BATCH_SIZE 个打包成一个 multipart 请求发往
+        /transcribe_batch；各批次并发发送，在途请求数受 ASR_MAX_CONCURRENCY 限制。
+
+        Returns:
+            {str(视频路径): 转录文本}
+        """
+        results: dict[str, str] = {}
+        if not video_paths:
+            return results
+        if not ASR_SERVER_URL:
+            self.recorder.log("warning", "ASR_SERVER_URL is not configured. Skipping video transcription.")
+            return results
+
+        # 建连与本地哈希/转码并行，第一个上传请求不再承担握手延迟
+        # （ASR 服务的 keep-alive 很短，所以放在转录前而不是研究开始时）
+        warmup = asyncio.create_task(self._warmup_asr())
+
+        pending: list[tuple[Path, str | None]] = []
+        for video_local_path in video_paths:
+            if not video_local_path.exists():
+                self.recorder.log("warning", "Video file not found for transcription: %s", video_local_path)
+                results[str(video_local_path)] = ""
+                continue
+            if self._asr_recently_failed(video_local_path):
+                results[str(video_local_path)] = ""
+                continue
+            digest, cached = await self._asr_cache_lookup(video_local_path)
+            if cached is not None:
+                results[str(video_local_path)] = cached
+            else:
+                pending.append((video_local_path, digest))
+
+        batches = [pending[i:i + ASR_BATCH_SIZE] for i in range(0, len(pending), ASR_BATCH_SIZE)]
+        for batch_results in await asyncio.gather(*(self._post_asr_batch(batch) for batch in batches)):
+            results.update(batch_results)
+        await warmup
+        return results
+
+    async def _post_asr_batch(self, batch: list[tuple[Path, str | None]]) -> dict[str, str]:
+        """把一批视频作为一个请求发往 /transcribe_batch；服务端不支持时逐个转录"""
+        batch_url = ASR_SERVER_URL.rsplit("/", 1)[0] + "/transcribe_batch"
+        batch_results: dict[str, str] = {}
+
+        # 抽取音轨并剔除无人声的视频；过大的音频不进批量请求，单独切段转录
+        speech_batch = []
+        uploads = []
+        oversized = []
+        for video_local_path, digest in batch:
+            upload_path, content_type = await self._prepare_asr_upload(video_local_path)
+            if not await self._has_speech(video_local_path, upload_path):
+                batch_results[str(video_local_path)] = ""
+            elif upload_path.stat().st_size > ASR_SEGMENT_THRESHOLD_BYTES:
+                oversized.append((video_local_path, digest, upload_path, content_type))
+            else:
+                speech_batch.append((video_local_path, digest))
+                uploads.append((upload_path, content_type))
+        if oversized:
+            texts = await asyncio.gather(*(self._transcribe_prepared(*item) for item in oversized))
+            batch_results.update({str(item[0]): text for item, text in zip(oversized, texts)})
+        batch = speech_batch
+        if not batch:
+            return batch_results
+
+        names = ", ".join(path.name for path, _ in batch)
+        self.recorder.log("info", "Sending %s videos to ASR server in one batch (language=zh): %s", len(batch), names)
+        try:
+            client = self._get_asr_client()
+            data = {'language': 'zh', 'task': 'transcribe'}  # 强制使用中文
+            body, headers = _build_multipart(
+                data, [('files', upload_path, content_type) for upload_path, content_type in uploads]
+            )
+            # 服务端逐个处理后一次性返回，超时按批量大小放宽
+            result = None
+            async with self._asr_sem:
+                async with client.stream(
+                    "POST", batch_url, content=body, headers=headers, timeout=ASR_TIMEOUT * len(batch)
+                ) as response:
+                    self.recorder.log("debug", "ASR batch response via %s", response.http_version)
+                    if response.status_code != 404:
+                        if response.status_code >= 400:
+                            raise await _asr_http_error(response)
+                        result = _json_loads(await response.aread())
+            if result is None:
+                # 旧版 ASR 服务没有批量接口
+                self.recorder.log("info", "ASR server has no /transcribe_batch endpoint, falling back to per-file requests")
+                texts = await asyncio.gather(*(self._transcribe_video(path) for path, _ in batch))
+                batch_results.update({str(path): text for (path, _), text in zip(batch, texts)})
+                return batch_results
+            if not isinstance(result, dict):
+                raise ValueError(f"unexpected batch response: {type(result).__name__}")
+            errors = result.get("errors") or {}
+            texts = result.get("results") or {}
+        except (httpx.HTTPError, OSError, ValueError) as exc:
+            status = f" - {exc.response.status_code}" if isinstance(exc, httpx.HTTPStatusError) else ""
+            self.recorder.log("error", "ASR batch failed for [%s]%s: %s", names, status, exc)
+            for path, _ in batch:
+                self._mark_asr_failed(path)
+            batch_results.update({str(path): "" for path, _ in batch})
+            return batch_results
+
+        for name, detail in errors.items():
+            self.recorder.log("error", "ASR failed for %s: %s", name, detail)
+
+        for (video_local_path, digest), (upload_path, _) in zip(batch, uploads):
+            if upload_path.name in errors:
+                self._mark_asr_failed(video_local_path)
+            transcription = texts.get(upload_path.name, "")
+            if transcription:
+                self.recorder.log("info", "ASR successful for %s: %s...", video_local_path.name, transcription[:50])
+                if digest:
+                    await self._asr_cache_store(digest, transcription)
+            batch_results[str(video_local_path)] = transcription
+        return batch_results
+
     async def _download_image(self, url: str) -> bytes | None:
         """从URL异步下载图片"""
         if not url:
             return None
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    response.raise_for_status()
-                    return await response.read()
+            async with self._get_http_session().get(url) as response:
+                response.raise_for_status()
+                return await response.read()
         except aiohttp.ClientError as e:
             self.recorder.log("warning", f"图片下载失败 {url}: {e}")
             return None
@@ -300,43 +945,63 @@ class ResearchAgent:
             self.recorder.log("warning", f"图片下载超时 {url}")
             return None
 
-    async def _perform_ocr_on_bytes(self, image_bytes: bytes) -> list[str]:
-        """对图片字节数据执行 OCR"""
-        if not self.ocr_engine or not image_bytes:
-            return []
-        
-        try:
-            # RapidOCR expects a file path or a numpy array.
-            # We can convert bytes to a file-like object in memory.
-            # A more direct approach might be to save to a temp file and pass the path,
-            # but given the prompt, let's try to keep it in memory if possible.
-            # RapidOCR also accepts PIL Image.
-            from PIL import Image
-            img = Image.open(io.BytesIO(image_bytes))
-            
-            # The demo showed engine("filepath.webp") which returns result.txts
-            # If we pass PIL Image, it might return a different structure.
-            # Let's assume it still returns a structure from which txts can be extracted.
-            ocr_results = await asyncio.to_thread(self.ocr_engine, img)
-            
-            if ocr_results and hasattr(ocr_results, 'txts'):
-                return ocr_results.txts
-            elif isinstance(ocr_results, list) and all(isinstance(item, tuple) for item in ocr_results):
-                # RapidOCR's default output when directly calling engine(image) is often
-                # a list of tuples: (bbox, text, score)
-                return [item[1] for item in ocr_results]
-            else:
-                self.recorder.log("warning", f"OCR 结果格式未知: {ocr_results}")
-                return []
+    async def _perform_ocr_on_batch(self, images_bytes: list[bytes | None]) -> list[list[str]]:
+        """
+        一次线程调度识别一批图片，结果与输入顺序一致
 
-        except Exception as e:
-            self.recorder.log("error", f"OCR 执行异常: {e}")
+        RapidOCR 不支持多图输入，批内在同一个工作线程里依次识别；
+        onnxruntime 自身已多线程推理，同一时间只跑一批反而避免 CPU 过度争用
+        """
+        if not self.ocr_engine:
+            return [[] for _ in images_bytes]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_ocr_executor(), self._ocr_images_sync, images_bytes)
+
+    def _ocr_images_sync(self, images_bytes: list[bytes | None]) -> list[list[str]]:
+        """在工作线程中依次识别多张图片（由 _perform_ocr_on_batch 调用）"""
+        # RapidOCR 原生接受 BGR numpy 数组：用 cv2 直接解码，省去 PIL 解码与 PIL->numpy 拷贝
+        # （cv2/numpy 是 RapidOCR 自身的依赖）；cv2 不支持的格式（如 GIF）再回退到 PIL
+        import cv2
+        import numpy as np
+
+        results = []
+        for image_bytes in images_bytes:
+            if not image_bytes:
+                results.append([])
+                continue
+            try:
+                img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+                if img is None:
+                    from PIL import Image
+                    img = Image.open(io.BytesIO(image_bytes))
+                results.append(self._parse_ocr_result(self.ocr_engine(img)))
+            except Exception as e:
+                self.recorder.log("error", f"OCR 执行异常: {e}")
+                results.append([])
+        return results
+
+    def _parse_ocr_result(self, ocr_results) -> list[str]:
+        """从 RapidOCR 返回值中取出文本列表"""
+        # The demo showed engine("filepath.webp") which returns result.txts
+        if ocr_results and hasattr(ocr_results, 'txts'):
+            return list(ocr_results.txts or [])
+        elif isinstance(ocr_results, list) and all(isinstance(item, tuple) for item in ocr_results):
+            # RapidOCR's default output when directly calling engine(image) is often
+            # a list of tuples: (bbox, text, score)
+            return [item[1] for item in ocr_results]
+        else:
+            self.recorder.log("warning", f"OCR 结果格式未知: {ocr_results}")
             return []
 
-    async def _extract_content_from_page(self):
-        """提取帖子完整内容：标题、正文、作者、图片、视频、评论"""
+    async def _extract_content_from_page(self, page: Page = None):
+        """提取帖子完整内容：标题、正文、作者、图片、视频、评论
+
+        Args:
+            page: 详情页所在标签页，默认为 self.page
+        """
+        page = page or self.page
         detail = {
-            "url": self.page.url,  # 添加当前页面URL
+            "url": page.url,  # 添加当前页面URL
             "title": "", "content": "",
             "author": "",  # 新增：博主名字
             "author_avatar": "",  # 新增：博主头像
@@ -347,54 +1012,37 @@ class ResearchAgent:
             "asr_results": ""   # Placeholder for ASR
         }
         try:
-            if await self.page.locator(SELECTORS["detail_title"]).count() > 0:
-                detail["title"] = await self.page.locator(SELECTORS["detail_title"]).inner_text()
-
-            if await self.page.locator(SELECTORS["detail_desc"]).count() > 0:
-                detail["content"] = await self.page.locator(SELECTORS["detail_desc"]).inner_text()
-
-            # 提取作者信息（使用.first避免多个匹配）
-            author_locator = self.page.locator(SELECTORS["detail_author"]).first
-            if await author_locator.count() > 0:
-                try:
-                    detail["author"] = await author_locator.inner_text()
-                except:
-                    detail["author"] = ""
-            
-            # 提取作者头像
-            avatar_locator = self.page.locator(SELECTORS["author_avatar"]).first
-            if await avatar_locator.count() > 0:
-                try:
-                    detail["author_avatar"] = await avatar_locator.get_attribute("src") or ""
-                except:
-                    detail["author_avatar"] = ""
-
-            # 提取发布日期
-            detail["publish_date"] = await self._extract_publish_date()
-
-            detail["image_urls"] = await self._extract_images()
-
-            # 提取并下载视频
-            video_info = await self._extract_video()
+            # 元信息、图片、视频互不依赖，并发发起以重叠 CDP 往返
+            meta, detail["image_urls"], video_info = await asyncio.gather(
+                self._extract_meta(page),
+                self._extract_images(page),
+                self._extract_video(page),  # 提取并下载视频
+            )
+            detail.update(meta)
             detail["video_url"] = video_info.get("video_url", "")
             detail["video_local_path"] = video_info.get("local_path", "")
             detail["media_type"] = "video" if detail["video_url"] else "image"
 
-            # 执行 ASR 转录（如果有视频）
-            if detail["video_local_path"] and os.path.exists(detail["video_local_path"]):
-                detail["asr_results"] = await self._transcribe_video(Path(detail["video_local_path"]))
+            # ASR 转录在所有帖子抓取完成后批量执行（见 run_deep_research）
 
             # OCR 处理图片
             if detail["image_urls"] and self.ocr_engine:
-                all_ocr_texts = []
                 self.recorder.log("info", f"✨ [OCR] 开始处理 {len(detail['image_urls'])} 张图片...")
-                for img_url in detail["image_urls"]:
-                    image_bytes = await self._download_image(img_url)
-                    if image_bytes:
-                        ocr_texts = await self._perform_ocr_on_bytes(image_bytes)
-                        if ocr_texts:
-                            all_ocr_texts.extend(ocr_texts)
-                            self.recorder.log("debug", f"📸 [OCR] 从图片 '{img_url[:50]}...' 提取文本: {ocr_texts[:3]}...")
+                # 已识别过的图片地址（跨帖子重复出现的封面等）直接复用结果
+                pending_urls = [u for u in dict.fromkeys(detail["image_urls"]) if u not in self._ocr_cache]
+                # 先并发下载全部图片，再一次性批量 OCR，结果按图片顺序合并
+                images_bytes = await asyncio.gather(
+                    *(self._download_image(img_url) for img_url in pending_urls)
+                )
+                pending_texts = await self._perform_ocr_on_batch(list(images_bytes))
+                for img_url, image_bytes, ocr_texts in zip(pending_urls, images_bytes, pending_texts):
+                    if image_bytes:  # 下载失败的不缓存，下次仍会重试
+                        self._ocr_cache[img_url] = ocr_texts
+                per_image_texts = [self._ocr_cache.get(u, []) for u in detail["image_urls"]]
+                for img_url, ocr_texts in zip(detail["image_urls"], per_image_texts):
+                    if ocr_texts:
+                        self.recorder.log("debug", f"📸 [OCR] 从图片 '{img_url[:50]}...' 提取文本: {ocr_texts[:3]}...")
+                all_ocr_texts = [text for texts in per_image_texts for text in texts]
                 if all_ocr_texts:
                     detail["ocr_results"] = all_ocr_texts
                     self.recorder.log("info", f"✅ [OCR] 从 {len(detail['image_urls'])} 张图片中提取到 {len(all_ocr_texts)} 条OCR文本。")
@@ -403,20 +1051,18 @@ class ResearchAgent:
 
 
             # 1. 滚动加载更多一级评论 (最多 DEEP_RESEARCH_COMMENT_LIMIT)
-            for _ in range(3): # Scroll a few times to get initial comments
-                await self._scroll_comment_area()
-                await asyncio.sleep(random.uniform(1, 2))
+            await self._load_more_comments(page)
 
             # 2. 展开所有折叠的二级评论
-            await self._expand_all_replies()
-            await asyncio.sleep(random.uniform(1, 2))
+            await self._expand_all_replies(page)
+            await asyncio.sleep(self._rng.uniform(1, 2))
 
             # 3. 提取评论
-            all_comments = await self._extract_comments()
+            all_comments = await self._extract_comments(page)
             detail["comments"] = all_comments[:DEEP_RESEARCH_COMMENT_LIMIT] # Limit comments
 
             # 提取帖子ID
-            note_id = self._extract_note_id_from_url(self.page.url)
+            note_id = self._extract_note_id_from_url(page.url)
             note_id_short = note_id[:8] if note_id else "unknown"
 
             media_count = len(detail["image_urls"]) if detail["media_type"] == "image" else 1
@@ -429,70 +1075,113 @@ class ResearchAgent:
             self.recorder.log("warning", f"内容提取异常: {e}")
         return detail
 
-    async def _extract_images(self):
+    async def _extract_images(self, page: Page):
         """从详情页DOM提取所有图片URL"""
         try:
-            return await self.page.evaluate("""
+            return await page.evaluate("""
                 () => {
-                    const urls = new Set();
+                    // 以去掉查询参数的地址去重，保留首次出现的原始地址
+                    const urls = new Map();
+                    const add = (src) => {
+                        const key = src.split('?')[0];
+                        if (!urls.has(key)) urls.set(key, src);
+                    };
                     // 在媒体容器中查找图片
                     const containers = document.querySelectorAll(
-                        '.note-detail-mask .swiper-slide img, ' +
-                        '.note-detail-mask .media-container img, ' +
-                        '.note-detail-mask [class*="carousel"] img, ' +
-                        '.note-detail-mask [class*="slider"] img'
+                        '#noteContainer .swiper-slide img, ' +
+                        '#noteContainer .media-container img, ' +
+                        '#noteContainer [class*="carousel"] img, ' +
+                        '#noteContainer [class*="slider"] img'
                     );
                     containers.forEach(img => {
                         const src = img.src || img.dataset.src || img.getAttribute('data-src') || '';
                         if (src && (src.includes('xhscdn') || src.includes('xiaohongshu') || src.includes('sns-'))
                             && !src.includes('avatar') && !src.includes('emoji')) {
-                            urls.add(src);
+                            add(src);
                         }
                     });
                     // 备选：detail mask 内所有大图
                     if (urls.size === 0) {
-                        document.querySelectorAll('.note-detail-mask img').forEach(img => {
+                        document.querySelectorAll('#noteContainer img').forEach(img => {
                             const src = img.src || img.dataset.src || '';
                             if (src && (src.includes('xhscdn') || src.includes('xiaohongshu'))
                                 && !src.includes('avatar') && !src.includes('emoji')
                                 && img.naturalWidth > 100) {
-                                urls.add(src);
+                                add(src);
                             }
                         });
                     }
-                    return [...urls];
+                    return [...urls.values()];
                 }
             """) or []
         except Exception as e:
             self.recorder.log("warning", f"图片提取异常: {e}")
             return []
 
-    async def _extract_video(self):
+    async def _extract_video(self, page: Page):
         """
         提取并下载视频
-        使用 VideoDownloader 从网页 __INITIAL_STATE__ 提取视频信息并下载
+        在同一次 evaluate 中判断是否为视频笔记，并直接从已加载页面的
+        __INITIAL_STATE__ 读取视频流，避免再抓取一次网页；
+        仅当页面状态中取不到视频流时才回退到 VideoDownloader 重新抓取。
         返回包含 video_url 和 local_path 的字典
         """
         try:
-            # 步骤1: DOM 快速判断是否为视频笔记
-            is_video = await self.page.evaluate("""
-                () => {
+            current_url = page.url
+            note_id = self._extract_note_id_from_url(current_url)
+
+            # 步骤1: 一次 evaluate 完成视频判断 + 视频流读取
+            video_state = await page.evaluate("""
+                (noteId) => {
                     const noteContainer = document.querySelector('#noteContainer, [data-type="video"]');
-                    return noteContainer && noteContainer.getAttribute('data-type') === 'video';
+                    const isVideo = !!(noteContainer && noteContainer.getAttribute('data-type') === 'video');
+                    if (!isVideo) return { isVideo: false };
+
+                    // Vue 响应式对象可能包了一层 value/_value
+                    const unwrap = (v) => (v && typeof v === 'object' && ('_value' in v || 'value' in v))
+                        ? (v._value !== undefined ? v._value : v.value) : v;
+                    try {
+                        const noteState = unwrap((window.__INITIAL_STATE__ || {}).note) || {};
+                        const detailMap = unwrap(noteState.noteDetailMap) || {};
+                        const key = (noteId && detailMap[noteId]) ? noteId
+                            : (unwrap(noteState.currentNoteId) || Object.keys(detailMap)[0]);
+                        const note = ((detailMap[key] || {}).note) || {};
+                        const stream = (((note.video || {}).media || {}).stream) || null;
+                        return {
+                            isVideo: true,
+                            noteId: key || noteId || '',
+                            title: note.title || '',
+                            desc: (note.desc || '').slice(0, 50),
+                            stream: stream ? JSON.parse(JSON.stringify(stream)) : null
+                        };
+                    } catch (e) {
+                        return { isVideo: true, noteId: noteId || '', stream: null };
+                    }
                 }
-            """)
+            """, note_id)
 
-            if not is_video:
+            if not video_state or not video_state.get("isVideo"):
                 return {"video_url": "", "local_path": ""}  # 不是视频笔记
 
-            # 步骤2: 获取当前 URL 和 note_id
-            current_url = self.page.url
-            note_id = self._extract_note_id_from_url(current_url)
+            # 步骤2: 日志用 note_id
+            note_id = note_id or video_state.get("noteId") or ""
             note_id_short = note_id[:8] if note_id else "unknown"
             self.recorder.log("info", f"📹 [视频下载] 帖子 {note_id_short}... 检测到视频，开始提取...")
 
-            # 步骤3: 提取视频信息并下载
-            result = await self.video_downloader.extract_and_download(current_url)
+            # 步骤3: 页面状态中有视频流则直接下载，否则回退到重新抓取网页
+            video_info = None
+            if note_id and video_state.get("stream"):
+                video_info = self.video_downloader.build_video_info(note_id, {
+                    "title": video_state.get("title", ""),
+                    "desc": video_state.get("desc", ""),
+                    "video": {"media": {"stream": video_state["stream"]}},
+                })
+
+            if video_info:
+                result = await self.video_downloader.download(video_info)
+            else:
+                self.recorder.log("debug", f"📹 [视频下载] 帖子 {note_id_short}... 页面状态无视频流，回退到网页抓取")
+                result = await self.video_downloader.extract_and_download(current_url)
 
             if result:
                 self.recorder.log("info", f"✅ [视频下载] 帖子 {note_id_short}... 下载成功")
@@ -507,35 +1196,58 @@ class ResearchAgent:
                 return {"video_url": "", "local_path": ""}
 
         except Exception as e:
-            note_id = self._extract_note_id_from_url(self.page.url if self.page else "")
+            note_id = self._extract_note_id_from_url(page.url if page else "")
             note_id_short = note_id[:8] if note_id else "unknown"
             self.recorder.log("error", f"❌ [视频下载] 帖子 {note_id_short}... 异常: {e}")
             return {"video_url": "", "local_path": ""}
 
-    async def _extract_publish_date(self) -> str:
-        """从详情页提取发布日期
+    async def _extract_meta(self, page: Page) -> dict:
+        """一次 evaluate 读取标题、正文、作者、头像、发布日期
 
         Returns:
-            发布日期字符串（如 "昨天 14:53 福建"）
-            如果提取失败，返回 "[发布日期抓取失败]"
+            包含 title/content/author/author_avatar/publish_date 的字典；
+            发布日期取不到时为 "[发布日期抓取失败]"
         """
+        meta = {"title": "", "content": "", "author": "", "author_avatar": "",
+                "publish_date": "[发布日期抓取失败]"}
         try:
-            # 尝试多个可能的选择器（容错）
-            selectors = [
-                '.bottom-container .date',
-                '.notedetail-menu + .date',
-                '[class*="bottom"] .date'
-            ]
-            for selector in selectors:
-                element = self.page.locator(selector).first
-                if await element.count() > 0:
-                    date_text = await element.inner_text()
-                    if date_text.strip():
-                        return date_text.strip()
-            return "[发布日期抓取失败]"
+            result = await page.evaluate(
+                """([sel, dateSelectors]) => {
+                    const text = (s) => {
+                        const el = document.querySelector(s);
+                        return el ? (el.innerText || '') : '';
+                    };
+                    const avatar = document.querySelector(sel.avatar);
+                    // 尝试多个可能的日期选择器（容错）
+                    let date = '';
+                    for (const s of dateSelectors) {
+                        date = text(s).trim();
+                        if (date) break;
+                    }
+                    return {
+                        title: text(sel.title),
+                        content: text(sel.desc),
+                        author: text(sel.author),
+                        author_avatar: avatar ? (avatar.getAttribute('src') || '') : '',
+                        publish_date: date,
+                    };
+                }""",
+                [
+                    {
+                        "title": SELECTORS["detail_title"],
+                        "desc": SELECTORS["detail_desc"],
+                        "author": SELECTORS["detail_author"],
+                        "avatar": SELECTORS["author_avatar"],
+                    },
+                    PUBLISH_DATE_SELECTORS,
+                ],
+            )
+            for key, value in (result or {}).items():
+                if value:
+                    meta[key] = value
         except Exception as e:
-            self.recorder.log("warning", f"日期提取异常: {e}")
-            return "[发布日期抓取失败]"
+            self.recorder.log("warning", f"元信息提取异常: {e}")
+        return meta
 
     def _extract_note_id_from_url(self, url: str) -> str:
         """从 URL 中提取 note ID
@@ -546,24 +1258,98 @@ class ResearchAgent:
         Returns:
             note ID（如 690b1814...），提取失败返回空字符串
         """
-        match = re.search(r'/explore/([a-f0-9]+)', url)
+        match = _NOTE_ID_RE.search(url)
         return match.group(1) if match else ""
 
-    async def _find_unvisited_note(self, notes):
-        """从笔记列表中找到第一个未访问的笔记
+    async def _enqueue_unvisited_notes(self, queue: asyncio.Queue, research_data: list):
+        """
+        在搜索结果页逐屏发现未访问的帖子并放入队列，收集够或无新帖子时结束
 
-        Args:
-            notes: 帖子元素列表
+        队列容量等于标签页池大小，详情页处理不过来时这里自然等待，不会提前扫过太多帖子
+        """
+        exhausted_scrolls = 0  # 连续找不到未访问帖子的次数
+        while len(research_data) < DEEP_RESEARCH_POST_LIMIT:
+            # 1. 检查环境
+            if "xiaohongshu.com" not in self.page.url or "search_result" not in self.page.url:
+                self.recorder.log("error", f"❌ [深度研究] 环境偏离: {self.page.url}")
+                break
 
-        Returns:
-            (target_note, note_id) 元组，未找到则返回 (None, None)
+            # 2. 寻找视口内的帖子
+            notes = await self._collect_note_links()
+            if not notes:
+                self.recorder.log("warning", "📍 [深度研究] 视口无帖子，滚动寻找...")
+                await self.human.human_scroll(500)
+                await asyncio.sleep(2)
+                notes = await self._collect_note_links()
+                if not notes:
+                    self.recorder.log("error", "❌ [深度研究] 未检测到笔记，结束研究")
+                    break
+
+            # 3. 前6个随机打乱（模拟浏览顺序），其余按页面顺序
+            head = notes[:6]
+            self._rng.shuffle(head)
+            found = 0
+            for note_id, note_url in head + notes[6:]:
+                if len(research_data) >= DEEP_RESEARCH_POST_LIMIT:
+                    break
+                if note_id in self.visited_note_ids:
+                    continue
+                self.visited_note_ids.add(note_id)  # 入队即视为已访问，不会重复打开
+                await queue.put((note_id, note_url))
+                found += 1
+
+            if found:
+                exhausted_scrolls = 0
+            else:
+                exhausted_scrolls += 1
+                if exhausted_scrolls > 3:
+                    self.recorder.log("warning", "⚠️ [深度研究] 可见帖子均已访问且滚动后无新帖子，结束研究")
+                    break
+
+            # 4. 滚动加载更多帖子
+            if len(research_data) < DEEP_RESEARCH_POST_LIMIT:
+                self.recorder.log("info", "📜 [深度研究] 滚动加载更多帖子...")
+                await self.human.human_scroll(self._rng.randint(800, 1200))
+                await asyncio.sleep(self._rng.uniform(1.0, 1.5))
+
+    async def _collect_note_links(self) -> list[tuple[str, str]]:
+        """一次 evaluate 读出搜索结果页所有帖子卡片的 (note_id, 详情页URL)
+
+        卡片本身是 <section>，链接在子元素 <a> 上；优先使用带 xsec_token 的链接，
+        直接打开不带 token 的详情页可能被拦截
         """
-        for note in notes:
-            href = await note.get_attribute('href')
-            note_id = self._extract_note_id_from_url(href or "")
-            if note_id and note_id not in self.visited_note_ids:
-                return note, note_id
-        return None, None
+        try:
+            cards = await self.page.evaluate(
+                """(selector) => [...document.querySelectorAll(selector)].map(
+                    card => [...card.querySelectorAll('a[href]')].map(a => a.href)
+                )""",
+                SELECTORS["note_card"],
+            )
+        except Exception as e:
+            self.recorder.log("debug", f"获取帖子链接失败: {e}")
+            return []
+
+        notes = []
+        for hrefs in cards or []:
+            note_id = next((i for i in map(self._extract_note_id_from_url, hrefs) if i), "")
+            if not note_id:
+                continue
+            note_url = next((h for h in hrefs if "xsec_token" in h), None) \
+                or next(h for h in hrefs if self._extract_note_id_from_url(h))
+            notes.append((note_id, note_url))
+        return notes
+
+    async def _open_and_extract(self, page: Page, note_url: str) -> dict | None:
+        """在给定标签页中直接打开帖子详情页并抓取内容；详情页加载失败返回 None"""
+        try:
+            # 不等整页 load（图片、视频、统计脚本），DOM 就绪后只等详情容器出现
+            await page.goto(note_url, wait_until="domcontentloaded")
+            await page.wait_for_selector(DETAIL_ROOT_SELECTOR, timeout=10000)
+        except Exception as e:
+            self.recorder.log("warning", f"⏱️ [深度研究] 详情页加载超时，跳过此帖: {e}")
+            return None
+        # 提取帖子内容（不调用 LLM，仅提取数据）
+        return await self._extract_content_from_page(page)
 
     async def _recover_from_environment_drift(self, search_term: str) -> bool:
         """环境偏离后的恢复逻辑
@@ -593,20 +1379,22 @@ class ResearchAgent:
             self.recorder.log("error", f"❌ [恢复] 环境恢复失败: {e}")
             return False
 
-    async def _extract_comments(self):
+    async def _extract_comments(self, page: Page):
         """从详情页DOM提取可见评论（一级+二级）"""
         try:
-            return await self.page.evaluate("""
-                () => {
+            return await page.evaluate("""
+                (limit) => {
                     const results = [];
                     // 查找所有一级评论容器
-                    const parentComments = document.querySelectorAll('.note-detail-mask .parent-comment');
+                    const parentComments = document.querySelectorAll('#noteContainer .parent-comment');
 
-                    parentComments.forEach(parentItem => {
+                    for (const parentItem of parentComments) {
+                        // 达到评论上限即停止，不再遍历剩余 DOM
+                        if (results.length >= limit) break;
                         try {
                             // 提取一级评论
                             const mainComment = parentItem.querySelector('.comment-item:not(.comment-item-sub)');
-                            if (!mainComment) return;
+                            if (!mainComment) continue;
 
                             const userEl = mainComment.querySelector('.author-wrapper .name, a.name');
                             const user = userEl ? userEl.textContent.trim() : '';
@@ -646,24 +1434,24 @@ class ResearchAgent:
                         } catch(e) {
                             console.error('评论提取错误:', e);
                         }
-                    });
+                    }
                     return results;
                 }
-            """) or []
+            """, DEEP_RESEARCH_COMMENT_LIMIT) or []
         except Exception as e:
             self.recorder.log("warning", f"评论提取异常: {e}")
             return []
 
-    async def _scroll_comment_area(self):
-        """滚动详情页右侧面板，加载更多评论"""
+    async def _scroll_comment_area(self, page: Page):
+        """滚动详情页右侧面板，加载更多评论；返回是否找到可滚动的容器"""
         try:
-            scrolled = await self.page.evaluate("""
+            scrolled = await page.evaluate("""
                 () => {
                     const containers = [
-                        document.querySelector('.note-detail-mask .interaction-container'),
-                        document.querySelector('.note-detail-mask .note-scroller'),
-                        document.querySelector('.note-detail-mask [class*="contentContainer"]'),
-                        document.querySelector('.note-detail-mask .right-container')
+                        document.querySelector('#noteContainer .interaction-container'),
+                        document.querySelector('#noteContainer .note-scroller'),
+                        document.querySelector('#noteContainer [class*="contentContainer"]'),
+                        document.querySelector('#noteContainer .right-container')
                     ];
                     for (const c of containers) {
                         if (c && c.scrollHeight > c.clientHeight) {
@@ -674,31 +1462,56 @@ class ResearchAgent:
                     return false;
                 }
             """)
-            if scrolled:
-                await asyncio.sleep(random.uniform(0.8, 1.5))
+            return bool(scrolled)
         except Exception:
-            pass
+            return False
+
+    async def _load_more_comments(self, page: Page):
+        """
+        滚动评论区加载一级评论，评论数不再增长或达到 DEEP_RESEARCH_COMMENT_LIMIT 即停止，
+        不再每轮固定等待
+        """
+        comment_locator = page.locator(COMMENT_ITEM_SELECTOR)
+        try:
+            count = await comment_locator.count()
+            for _ in range(COMMENT_SCROLL_MAX_ROUNDS):
+                if count >= DEEP_RESEARCH_COMMENT_LIMIT or not await self._scroll_comment_area(page):
+                    break
+                try:
+                    await page.wait_for_function(
+                        "([selector, n]) => document.querySelectorAll(selector).length > n",
+                        arg=[COMMENT_ITEM_SELECTOR, count],
+                        timeout=COMMENT_LOAD_TIMEOUT_MS,
+                    )
+                except PlaywrightTimeoutError:
+                    break  # 没有新评论加载出来
+                count = await comment_locator.count()
+        except Exception as e:
+            self.recorder.log("debug", f"加载评论异常: {e}")
 
-    async def _expand_all_replies(self):
+    async def _expand_all_replies(self, page: Page):
         """展开所有折叠的二级评论（点击"展开X条回复"按钮）"""
         try:
-            expanded_count = await self.page.evaluate("""
-                () => {
-                    const showMoreButtons = document.querySelectorAll('.note-detail-mask .show-more');
+            # 只展开前 DEEP_RESEARCH_COMMENT_LIMIT 条一级评论下的回复，超出部分不会被提取
+            expanded_count = await page.evaluate("""
+                (limit) => {
+                    const parents = [...document.querySelectorAll('#noteContainer .parent-comment')].slice(0, limit);
                     let count = 0;
-                    showMoreButtons.forEach(btn => {
-                        if (btn && btn.textContent.includes('展开') && btn.textContent.includes('回复')) {
-                            btn.click();
-                            count++;
-                        }
+                    parents.forEach(parent => {
+                        parent.querySelectorAll('.show-more').forEach(btn => {
+                            if (btn.textContent.includes('展开') && btn.textContent.includes('回复')) {
+                                btn.click();
+                                count++;
+                            }
+                        });
                     });
                     return count;
                 }
-            """)
+            """, DEEP_RESEARCH_COMMENT_LIMIT)
             if expanded_count > 0:
                 self.recorder.log("info", f"💬 [评论] 展开了 {expanded_count} 个折叠的回复")
                 # 等待展开的评论加载
-                await asyncio.sleep(random.uniform(1.0, 2.0))
+                await asyncio.sleep(self._rng.uniform(1.0, 2.0))
         except Exception as e:
             self.recorder.log("warning", f"展开回复失败: {e}")
 
@@ -720,43 +1533,41 @@ class ResearchAgent:
         if not report or not research_data:
             return report
 
-        idx_to_url: dict[int, str] = {}
-        for i, post in enumerate(research_data, 1):
-            url = (post.get("url") or "").strip()
-            if url:
-                idx_to_url[i] = url
+        views = [_post_view(p) for p in research_data]
+        idx_to_url: dict[int, str] = {i: v.url for i, v in enumerate(views, 1) if v.url}
 
         if not idx_to_url:
             return report
 
+        # 没有引用、参考文献和代码块（mermaid）时逐行处理不会改动任何内容，只需统一换行与结尾
+        if "帖子[" not in report and "链接(" not in report and "## 参考文献" not in report and "```" not in report:
+            return "\n".join(report.splitlines()).rstrip() + "\n"
+
+        # 见[帖子[3]]评论 → 见[帖子[3]](URL)评论；[帖子[3]]（未带链接）→ [帖子[3]](URL)
+        def repl_cite(m: re.Match):
+            idx = int(m.group(2))
+            url = idx_to_url.get(idx)
+            if not url:
+                return m.group(0)
+            prefix = "见" if m.group(1) else ""
+            return f"{prefix}[帖子[{idx}]]({url})"
+
         def _fix_line(line: str) -> str:
-            # 去掉引用外层反引号（仅针对“见[帖子[..]]”这类片段）
-            line = re.sub(r"`\s*(见\s*\[帖子\[(\d+)\]\][^`]*)\s*`", r"\1", line)
-
-            # 见[帖子[3]]评论 → 见[帖子[3]](URL)评论
-            def repl_seen(m: re.Match):
-                idx = int(m.group(2))
-                url = idx_to_url.get(idx)
-                if not url:
-                    return m.group(0)
-                tail = m.group(3) or ""
-                return f"见[帖子[{idx}]]({url}){tail}"
-
-            # 若已经是 Markdown 链接（]后紧跟(），则不重复注入 URL
-            line = re.sub(r"(见\s*)\[帖子\[(\d+)\]\](?!\()(评论)?", repl_seen, line)
-
-            # [帖子[3]]（未带链接）→ [帖子[3]](URL)
-            def repl_bare(m: re.Match):
-                idx = int(m.group(1))
-                url = idx_to_url.get(idx)
-                if not url:
-                    return m.group(0)
-                return f"[帖子[{idx}]]({url})"
-
-            line = re.sub(r"\[帖子\[(\d+)\]\](?!\()", repl_bare, line)
+            # 绝大多数行不含引用，直接跳过全部正则；含引用的行也只跑可能命中的那几条
+            has_cite = "帖子[" in line
+            has_link = "链接(" in line
+            if not (has_cite or has_link):
+                return line
+
+            if has_cite:
+                # 去掉引用外层反引号（仅针对“见[帖子[..]]”这类片段）
+                if "`" in line:
+                    line = _RE_CITE_BACKTICK.sub(r"\1", line)
+                line = _RE_CITE.sub(repl_cite, line)
 
             # 参考文献常见写法：链接(URL) → [帖子链接](URL)
-            line = re.sub(r"链接\((https?://[^\s)]+)\)", r"[帖子链接](\1)", line)
+            if has_link:
+                line = _RE_REF_LINK.sub(r"[帖子链接](\1)", line)
             return line
 
         def _convert_mermaid_bar_to_xychart(mermaid_src: str) -> str:
@@ -769,6 +1580,9 @@ class ResearchAgent:
                 bar "A": 10
             转为 mermaid@10 支持的 xychart-beta。
             """
+            # 绝大多数 mermaid 图不是 bar 写法，不必逐行拆分
+            if not mermaid_src.lstrip().startswith("bar"):
+                return mermaid_src
             lines = [ln.rstrip() for ln in mermaid_src.splitlines()]
             # 找到首个非空行
             i0 = next((i for i, ln in enumerate(lines) if ln.strip()), None)
@@ -791,9 +1605,9 @@ class ResearchAgent:
                     # y-axis 次数
                     y_label = s[len("y-axis") :].strip() or y_label
                     continue
-                m = re.match(r'^bar\s+"?(.*?)"?\s*:\s*([0-9]+(?:\.[0-9]+)?)\s*$', s)
-                if m:
-                    points.append((m.group(1), float(m.group(2))))
+                point = _parse_bar_line(s)
+                if point:
+                    points.append(point)
 
             if not points:
                 return mermaid_src
@@ -825,13 +1639,11 @@ class ResearchAgent:
 
         def _rebuild_references_section() -> str:
             lines: list[str] = ["## 参考文献", ""]
-            for i, post in enumerate(research_data, 1):
-                url = (post.get("url") or "").strip()
-                title = (post.get("title") or "(无标题)").strip()
-                author = (post.get("author") or "").strip()
-                publish_date = (post.get("publish_date") or "").strip()
-                author = author if author else "作者未提供"
-                publish_date = publish_date if publish_date else "发布日期未提供"
+            for i, v in enumerate(views, 1):
+                url = v.url
+                title = v.title or "(无标题)"
+                author = v.author or "作者未提供"
+                publish_date = v.publish_date or "发布日期未提供"
                 if url:
                     lines.append(f"[{i}] @{author}. 《{title}》. 小红书, {publish_date}. [帖子链接]({url})")
                 else:
@@ -840,6 +1652,7 @@ class ResearchAgent:
 
         raw_lines = report.splitlines()
         out: list[str] = []
+        out_append = out.append  # 热循环里省去每行一次属性查找
         in_fence = False
         fence_lang = ""
         mermaid_buf: list[str] = []
@@ -848,8 +1661,15 @@ class ResearchAgent:
         i = 0
         while i < len(raw_lines):
             line = raw_lines[i]
-            if not in_fence and line.strip() == "## 参考文献":
-                out.append(_rebuild_references_section().rstrip())
+            stripped = line.strip()
+            # 最常见的情况：围栏外的普通正文行（不以 # 或 ` 开头），直接修正引用
+            if not in_fence and (not stripped or stripped[0] not in "#`"):
+                out_append(_fix_line(line))
+                i += 1
+                continue
+
+            if not in_fence and stripped == "## 参考文献":
+                out_append(_rebuild_references_section().rstrip())
                 i += 1
                 while i < len(raw_lines):
                     nxt = raw_lines[i]
@@ -858,11 +1678,11 @@ class ResearchAgent:
                     i += 1
                 continue
 
-            if line.strip().startswith("```"):
+            if stripped.startswith("```"):
                 if not in_fence:
                     in_fence = True
-                    fence_lang = line.strip()[3:].strip().lower()
-                    out.append(line)
+                    fence_lang = stripped[3:].strip().lower()
+                    out_append(line)
                     if fence_lang == "mermaid":
                         mermaid_buf = []
                     i += 1
@@ -872,9 +1692,10 @@ class ResearchAgent:
                     if fence_lang == "mermaid" and mermaid_buf is not None:
                         src = "\n".join(mermaid_buf)
                         src2 = _convert_mermaid_bar_to_xychart(src)
-                        out.append(src2)
+                        out.extend((src2, line))
                         mermaid_buf = []
-                    out.append(line)
+                    else:
+                        out_append(line)
                     in_fence = False
                     fence_lang = ""
                     i += 1
@@ -886,32 +1707,32 @@ class ResearchAgent:
                 continue
 
             if in_fence:
-                out.append(line)
+                out_append(line)
                 i += 1
                 continue
 
-            out.append(_fix_line(line))
+            out_append(_fix_line(line))
             i += 1
 
         return "\n".join(out).rstrip() + "\n"
 
     async def _save_report(self, report: str, keyword: str):
         report_filename = self.output_dir / f"research_report_{keyword}.md"
-        with open(report_filename, "w", encoding="utf-8") as f:
-            f.write(report)
+        # 写盘与 HTML 渲染放到线程里，避免大报告阻塞事件循环
+        await asyncio.to_thread(_write_text, report_filename, report)
         self.recorder.log("info", f"Research report saved to {report_filename}")
 
         # 参考 data/demo.html 的模板样式：同步输出对应 HTML
         try:
             html_filename = self.output_dir / f"research_report_{keyword}.html"
-            html_text = render_deep_research_html(
+            html_text = await asyncio.to_thread(
+                render_deep_research_html,
                 report,
                 title_fallback=f"深度调研报告：{keyword}",
                 subtitle=f"基于抓取数据的深度研究 | 关键词：{keyword}",
                 generated_at=datetime.now(),
             )
-            with open(html_filename, "w", encoding="utf-8") as f:
-                f.write(html_text)
+            await asyncio.to_thread(_write_text, html_filename, html_text)
             self.recorder.log("info", f"Research report HTML saved to {html_filename}")
         except Exception as e:
             self.recorder.log("warning", f"HTML 报告输出失败（已保留 Markdown）：{e}")
@@ -927,64 +1748,60 @@ class ResearchAgent:
                 return text
             return text[:limit] + "…"
 
-        def _safe_list(v):
-            return v if isinstance(v, list) else []
+        # 每篇帖子只规整一次，后面各段统计/证据包都直接用 views
+        views = [_post_view(p) for p in research_data]
 
         # 关键词：尽量从 URL 解析（若失败则回退为“主题”）
         keyword = "主题"
-        if research_data:
-            url0 = (research_data[0].get("url") or "").strip()
+        if views:
+            url0 = views[0].url
             if "keyword=" in url0:
                 keyword = url0.split("keyword=")[-1].split("&")[0] or keyword
-                try:
-                    from urllib.parse import unquote
-                    keyword = unquote(keyword)
-                except Exception:
-                    pass
+                keyword = unquote(keyword)
 
         posts_cnt = len(research_data)
-        total_comments = sum(len(_safe_list(p.get("comments"))) for p in research_data)
-        posts_with_video = sum(1 for p in research_data if (p.get("video_url") or "").strip())
-        posts_with_images = sum(1 for p in research_data if len(_safe_list(p.get("image_urls"))) > 0)
-        posts_with_asr = sum(1 for p in research_data if (p.get("asr_results") or "").strip())
-        posts_with_ocr = sum(1 for p in research_data if len(_safe_list(p.get("ocr_results"))) > 0)
-        posts_with_text = sum(1 for p in research_data if (p.get("content") or "").strip())
+        # 样本概况计数：一次遍历累加
+        total_comments = posts_with_video = posts_with_images = 0
+        posts_with_asr = posts_with_ocr = posts_with_text = 0
+        for v in views:
+            total_comments += len(v.comments)
+            if v.video_url:
+                posts_with_video += 1
+            if v.image_urls:
+                posts_with_images += 1
+            if v.asr:
+                posts_with_asr += 1
+            if v.ocr:
+                posts_with_ocr += 1
+            if v.content:
+                posts_with_text += 1
 
         # === 额外统计：用于“图表/对比/量化”输出（避免模型只写空洞论述） ===
-        def _collect_text(post: dict) -> str:
-            parts: list[str] = []
-            for k in ("title", "content", "asr_results"):
-                v = (post.get(k) or "").strip()
-                if v:
-                    parts.append(v)
-            ocr = _safe_list(post.get("ocr_results"))
-            if ocr:
-                parts.append(" ".join([str(x) for x in ocr if str(x).strip()]))
-            for c in _safe_list(post.get("comments")):
+        def _collect_text(view: PostView) -> str:
+            parts: list[str] = [t for t in (view.title, view.content, view.asr) if t]
+            if view.ocr:
+                parts.append(" ".join([str(x) for x in view.ocr if str(x).strip()]))
+            for c in view.comments:
                 cv = (c.get("content") or "").strip()
                 if cv:
                     parts.append(cv)
             return "\n".join(parts)
 
-        all_text = "\n".join([_collect_text(p) for p in research_data])
+        # 每篇帖子的文本只拼一次，后面的短语溯源直接复用
+        post_texts = [_collect_text(v) for v in views]
+        all_text = "\n".join(post_texts)
 
         # 简易“短语”抽取：用中文连续串近似（不依赖外部分词库）
-        import collections
-
-        stop = {
-            "这个", "一个", "我们", "你们", "他们", "就是", "因为", "所以", "但是", "然后", "真的", "感觉", "比较",
-            "如果", "还是", "可以", "不是", "没有", "很多", "特别", "以及", "一些", "这种", "那种", "怎么", "为什么",
-            "时候", "现在", "已经", "不会", "可能", "需要", "觉得", "问题", "内容", "评论", "帖子", "小红书", "春晚",
-        }
-        tokens = [t for t in re.findall(r"[\u4e00-\u9fff]{2,6}", all_text) if t not in stop]
-        term_counter = collections.Counter(tokens)
+        term_counter = collections.Counter(
+            t for t in _TERM_RE.findall(all_text) if t not in _TERM_STOPWORDS
+        )
 
         # term -> 出现在哪些帖子（最多给 5 个索引，方便模型引用）
         term_posts: dict[str, list[int]] = {}
         for term, _ in term_counter.most_common(40):
             posts_idx = []
-            for idx, post in enumerate(research_data, 1):
-                if term in _collect_text(post):
+            for idx, text in enumerate(post_texts, 1):
+                if term in text:
                     posts_idx.append(idx)
                 if len(posts_idx) >= 5:
                     break
@@ -999,15 +1816,19 @@ class ResearchAgent:
             ]
         )
 
+        # 每帖点赞最高的 8 条评论只算一次（与稳定排序后切片结果一致）：首条即最高赞，证据包直接复用
+        def _likes(c: dict) -> int:
+            return int(c.get("likes") or 0)
+
+        top_comments_per_post = [heapq.nlargest(8, v.comments, key=_likes) for v in views]
+
         # 评论互动强度：每帖评论数、点赞Top
         per_post_stats_rows = []
-        for i, post in enumerate(research_data, 1):
-            comments = _safe_list(post.get("comments"))
-            like_max = 0
-            if comments:
-                like_max = max(int(c.get("likes") or 0) for c in comments)
+        for i, v in enumerate(views, 1):
+            top_comments = top_comments_per_post[i - 1]
+            like_max = _likes(top_comments[0]) if top_comments else 0
             per_post_stats_rows.append(
-                f"| 帖子[{i}] | {len((post.get('content') or '').strip())} | {len(comments)} | {like_max} | {'视频' if (post.get('video_url') or '').strip() else '图文/图片'} |"
+                f"| 帖子[{i}] | {len(v.content)} | {len(v.comments)} | {like_max} | {'视频' if v.video_url else '图文/图片'} |"
             )
         per_post_stats_table = "\n".join(
             ["| 帖子 | 正文字数(粗略) | 评论数 | 评论最高赞 | 形态 |", "|---|---:|---:|---:|---|"]
@@ -1017,37 +1838,37 @@ class ResearchAgent:
 
         # 结构化证据包：让模型更容易“引用证据”而不是复述全文
         evidence_blocks: list[str] = []
-        for i, post in enumerate(research_data, 1):
-            comments = _safe_list(post.get("comments"))
-            top_comments = sorted(comments, key=lambda c: int(c.get("likes") or 0), reverse=True)[:8]
+        for i, (post, v) in enumerate(zip(research_data, views), 1):
+            top_comments = top_comments_per_post[i - 1]
+            url = post.get("url", "N/A")  # 原样输出；只有缺少该字段时才写 N/A
 
             top_comments_md = "\n".join(
-                [
-                    f"- （👍{int(c.get('likes') or 0)}）**{(c.get('user') or '匿名').strip()}**：{_truncate(c.get('content') or '', 160)}"
-                    for c in top_comments
-                    if (c.get("content") or "").strip()
-                ]
+                f"- （👍{int(c.get('likes') or 0)}）**{(c.get('user') or '匿名').strip()}**：{_truncate(c.get('content') or '', 160)}"
+                for c in top_comments
+                if (c.get("content") or "").strip()
             ).strip()
 
             evidence_blocks.append(
                 "\n".join(
-                    [
+                    (
                         f"### 帖子[{i}]",
-                        f"- URL：{post.get('url', 'N/A')}",
-                        f"- 正文/引用链接（必须用于报告引用）：[帖子[{i}]]({post.get('url', 'N/A')})",
-                        f"- 标题：{(post.get('title') or '(无标题)').strip()}",
-                        f"- 作者：{(post.get('author') or '(未知作者)').strip()}",
-                        f"- 发布日期：{(post.get('publish_date') or '(未知)').strip()}",
-                        f"- 媒体：{'视频' if (post.get('video_url') or '').strip() else '图文/图片'}（图片{len(_safe_list(post.get('image_urls')))}张）",
-                        f"- 正文摘录：{_truncate(post.get('content') or '', 420) or '(无正文)'}",
-                        f"- ASR摘录：{_truncate(post.get('asr_results') or '', 420) or '(无)'}",
-                        f"- OCR摘录：{_truncate(' '.join(_safe_list(post.get('ocr_results'))), 420) or '(无)'}",
-                        f"- 评论数：{len(comments)}",
+                        f"- URL：{url}",
+                        f"- 正文/引用链接（必须用于报告引用）：[帖子[{i}]]({url})",
+                        f"- 标题：{v.title or '(无标题)'}",
+                        f"- 作者：{v.author or '(未知作者)'}",
+                        f"- 发布日期：{v.publish_date or '(未知)'}",
+                        f"- 媒体：{'视频' if v.video_url else '图文/图片'}（图片{len(v.image_urls)}张）",
+                        f"- 正文摘录：{_truncate(v.content, 420) or '(无正文)'}",
+                        f"- ASR摘录：{_truncate(v.asr, 420) or '(无)'}",
+                        f"- OCR摘录：{_truncate(' '.join(v.ocr), 420) or '(无)'}",
+                        f"- 评论数：{len(v.comments)}",
                         f"- Top评论：\n{top_comments_md if top_comments_md else '(无可用评论摘录)'}",
-                    ]
+                    )
                 )
             )
 
+        evidence_text = "\n".join(evidence_blocks)
+
         prompt = f"""你是一位**资深用户研究/行业分析师**。你将基于“证据包”撰写一份**深度调研报告（Markdown）**。
 
 ## 研究主题
@@ -1128,27 +1949,54 @@ class ResearchAgent:
 ---
 
 ## 证据包（只许引用，不要在报告里复写全文）
-{chr(10).join(evidence_blocks)}
+{evidence_text}
 """
 
         return prompt
 
 # Example usage (for testing purposes)
 async def main():
-    # This requires a running Chrome instance with remote debugging on port 9222
-    # and a valid Zhipu AI Key (or Kimi if LLMClient is adapted)
-    
-    # Temporarily set some settings for testing
+    """
+    用本地假 ASR 服务跑一遍视频转录链路（抽音轨、缓存、批量上传），不需要浏览器和 ASR 服务
+
+    用法: python -m core.researcher [视频文件 ...]；不传文件时生成一个 8MB 的测试文件
+    """
+    global ASR_SERVER_URL
+    import sys
     from unittest.mock import MagicMock
+    from core.recorder import SessionRecorder
+    from tests.fakes.asr_server import FakeASRServer
+
+    # 浏览器与 LLM 不参与转录链路，仍用 Mock
     browser_manager = MagicMock(spec=BrowserManager)
     browser_manager.page = MagicMock(spec=Page) # Mock the page object
-    
-    # Mock LLMClient to return dummy text
     llm_client = MagicMock(spec=LLMClient)
-    llm_client.generate_text.return_value = "这是一个模拟的深度研究报告。"
 
-    research_agent = ResearchAgent(browser_manager, llm_client)
-    await research_agent.run_deep_research("月龄宝宝推荐奶粉")
+    fake_server = FakeASRServer()
+    ASR_SERVER_URL = await fake_server.start()
+    research_agent = ResearchAgent(browser_manager, llm_client, SessionRecorder())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 使用临时缓存，避免假转录结果写入真实的 ASR 缓存
+        research_agent._asr_cache = ASRCache(Path(tmp_dir) / "asr_cache.json")
+        videos = [Path(p) for p in sys.argv[1:]]
+        if not videos:
+            sample = Path(tmp_dir) / "sample.mp4"
+            sample.write_bytes(os.urandom(8 * 1024 * 1024))
+            videos = [sample]
+
+        try:
+            for label in ("cold", "cached"):
+                start = time.perf_counter()
+                results = await research_agent._transcribe_videos_batch(videos)
+                research_agent.recorder.log(
+                    "info", "[%s] %d videos transcribed in %.3fs (server: %d requests, %.1fMB received)",
+                    label, len(results), time.perf_counter() - start,
+                    fake_server.requests, fake_server.bytes_received / 1024 / 1024,
+                )
+        finally:
+            await research_agent.aclose()
+            await fake_server.stop()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,4 +1,13 @@
+import json
 import random
+from pathlib import Path
+
+try:
+    import orjson  # 可选依赖：C 实现的 JSON 解析，冷启动首次读取 emotions.json 更快
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 from core.llm_client import LLMClient
 from core.product_manager import ProductManager
 
@@ -13,6 +22,10 @@ class SmartInteractAgent:
         self.recorder = recorder
         self.pm = product_manager
         self.llm = LLMClient(recorder)
+        # emotions.json 缓存：文件修改时间变化才重新读取
+        self._emotions_path = Path(__file__).parent.parent / "data" / "emotions.json"
+        self._emotions_cache = None
+        self._emotions_mtime = None
 
     def decide_interaction(self, title: str, content: str) -> dict:
         """
@@ -116,25 +129,18 @@ class SmartInteractAgent:
         获取评论模板
         :param interaction_type: 互动类型（normal/promo/help_first/value_share/direct_promo）
         """
-        import json
-        from pathlib import Path
-
-        emotions_file = Path(__file__).parent.parent / "data" / "emotions.json"
-
         try:
-            if emotions_file.exists():
-                with open(emotions_file, "r", encoding="utf-8") as f:
-                    emotions = json.load(f)
-
+            emotions = self._load_emotions()
+            if emotions is not None:
                 templates = emotions.get("comment_templates", {})
 
                 if interaction_type == "promo":
-                    return templates.get("软广推广", [])
+                    return list(templates.get("软广推广", []))  # 返回副本，调用方修改不影响缓存
                 elif interaction_type == "normal":
                     # 合并工具交流和简单互动
                     return templates.get("工具交流", []) + templates.get("简单互动", [])
                 else:
-                    return templates.get("软广推广", [])
+                    return list(templates.get("软广推广", []))
 
         except Exception as e:
             self.recorder.log("warning", f"⚠️ [智能互动] 加载评论模板失败: {e}")
@@ -147,6 +153,18 @@ class SmartInteractAgent:
             "🔥"
         ]
 
+    def _load_emotions(self):
+        """读取 emotions.json（按修改时间缓存），文件不存在返回 None"""
+        try:
+            mtime = self._emotions_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._emotions_cache = self._emotions_mtime = None
+            return None
+        if self._emotions_cache is None or mtime != self._emotions_mtime:
+            self._emotions_cache = _json_loads(self._emotions_path.read_bytes())
+            self._emotions_mtime = mtime
+        return self._emotions_cache
+
     def record_interaction(self, interaction_result: dict):
         """
         记录互动行为
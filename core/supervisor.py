@@ -1,7 +1,8 @@
 import asyncio
-import time
+import functools
 import random
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List
 from core.recovery import RecoveryAgent
 from core.writer import WriterAgent
@@ -16,6 +17,10 @@ from core.trend_tracker import TrendTracker
 from core.researcher import ResearchAgent # Import ResearchAgent
 from config.settings import BASE_URL, PUBLISH_HOURS, INSPIRATION_THRESHOLD, ENABLE_PHASE2_ANALYTICS, ANALYSIS_INTERVAL, ENABLE_PHASE4_TRENDS, DEEP_RESEARCH_ENABLED
 
+_PUBLISH_HOURS = frozenset(PUBLISH_HOURS)  # 发布时间点，集合查找
+_DEEP_RECOVERY_TIMEOUT = 30  # 深度恢复（刷新/回首页）最长耗时（秒）
+_CREATION_STEP_TIMEOUT = 300  # 生图、发布各自最长耗时（秒），卡住时放弃本次创作，主循环继续
+
 class Supervisor:
     def __init__(self, browser_manager, human, executor, recorder, llm_client, max_duration=3600):
         self.bm = browser_manager
@@ -26,6 +31,8 @@ class Supervisor:
         # 实例化维修工
         self.recovery = RecoveryAgent(browser_manager.page, recorder)
         self.max_duration = max_duration
+        self._rng = random.Random()  # 实例独享的随机数生成器，循环间隔抖动不与其它线程争用全局 random
+        self._io_pool: ThreadPoolExecutor | None = None  # 分析/追踪的阻塞调用专用线程池，首次使用时创建
 
         # === 新增：产品管理和内容策略 ===
         self.product_manager = ProductManager(recorder)
@@ -44,7 +51,7 @@ class Supervisor:
         if ENABLE_PHASE2_ANALYTICS:
             self.analytics = ContentAnalytics(recorder)
             self.viral_analyzer = ViralAnalyzer(recorder, self.analytics)
-            self.last_analysis_time = 0
+            self.next_analysis_at = 0.0  # 下次分析的时刻（事件循环单调时钟）
             self.analysis_interval = ANALYSIS_INTERVAL  # 从配置读取，默认4小时
             self.viral_patterns = {}  # 缓存的爆款模式
             self.recorder.log("info", "📊 [车间主任] Phase 2 数据分析已启用")
@@ -59,42 +66,45 @@ class Supervisor:
         else:
             self.trend_tracker = None
 
+        # 爆款模式里的优化建议：每次分析后展开一次，创作流程直接读取
+        self._cached_recs: tuple[str, ...] = ()
+
         # 故障计数器（用于日志记录，但不设上限）
         self.consecutive_failures = 0
 
         # 创作相关状态
-        self.last_creation_time = 0
+        self.next_creation_at = 0.0  # 冷却结束的时刻（事件循环单调时钟，不受系统时间调整影响）
         self.creation_cooldown = 3600  # 创作冷却时间：1小时 
 
     async def start_shift(self):
         """开始轮班 - 持续运营循环（24小时）"""
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_duration
         self.recorder.log("info", "👨‍✈️ [车间主任] 24小时运营启动，维修工待命")
 
-        while time.time() - start_time < self.max_duration:
+        while loop.time() < deadline:
             try:
                 # === 模式1：浏览互动（主要时间） ===
                 await self.executor.execute_one_cycle()
 
                 # === 模式2：创作发帖（条件触发） ===
                 kb = self.executor.kb
-                current_time = time.time()
+                now = loop.time()
 
-                # 检查是否需要创作（积累3个高质量素材 + 冷却时间）
-                if (kb.should_create_content() and
-                    current_time - self.last_creation_time > self.creation_cooldown):
+                # 检查是否需要创作（冷却时间已过 + 积累3个高质量素材）
+                if now >= self.next_creation_at and kb.should_create_content():
                     await self._create_and_publish_cycle()
-                    self.last_creation_time = current_time
+                    self.next_creation_at = now + self.creation_cooldown
 
                 # === Phase 2: 定期数据分析（每天一次） ===
-                if self.analytics and current_time - self.last_analysis_time > self.analysis_interval:
+                if self.analytics and now >= self.next_analysis_at:
                     await self._perform_data_analysis()
-                    self.last_analysis_time = current_time
+                    self.next_analysis_at = now + self.analysis_interval
 
                 # 成功执行，重置故障计数器
                 self.consecutive_failures = 0
 
-                rest_time = random.uniform(2, 5)
+                rest_time = self._rng.uniform(2, 5)
                 self.recorder.log("info", f"☕ [车间主任] 休息 {rest_time:.1f}s")
                 await asyncio.sleep(rest_time)
 
@@ -126,9 +136,15 @@ class Supervisor:
                     # 维修失败，但不退出，而是执行深度恢复
                     self.recorder.log("warning", "⚠️ 维修失败，执行深度恢复...")
                     await self._deep_recovery()
-                    await asyncio.sleep(10)  # 等待更长时间
+                    # 按连续失败次数指数退避（2s 起，上限 60s），加抖动避免多实例同时重试
+                    backoff = min(60, 2 ** min(self.consecutive_failures, 6))
+                    await asyncio.sleep(backoff + self._rng.uniform(0, 1))
                     continue  # 继续循环，不退出
 
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False)
+            self._io_pool = None
+
         self.recorder.log("info", "👨‍✈️ [车间主任] 下班时间到")
     
     async def _create_and_publish_cycle(self):
@@ -136,13 +152,11 @@ class Supervisor:
         try:
             self.recorder.log("info", "🎨 [创作流程] 开始创作+发帖流程...")
 
-            # 显示素材库统计
-            stats = self.executor.kb.get_stats()
+            # 显示素材库统计（素材库是磁盘上的 JSON，读写都放到线程池，不卡住页面事件）
+            stats = await self._run_io(self.executor.kb.get_stats)
             self.recorder.log("info",
-                f"📊 [素材库] 总计:{stats['total']} | "
-                f"未使用:{stats['unused']} | "
-                f"高质量未使用:{stats['high_quality_unused']} | "
-                f"已使用:{stats['used']}"
+                "📊 [素材库] 总计:%s | 未使用:%s | 高质量未使用:%s | 已使用:%s",
+                stats['total'], stats['unused'], stats['high_quality_unused'], stats['used']
             )
 
             # 1. 决定内容类型（价值内容 vs 产品宣传）
@@ -178,25 +192,25 @@ class Supervisor:
                 self.recorder.log("info", f"🎨 [创作流程] 价值内容已生成: 《{draft.get('title', '')}》")
 
                 # 创作完成后，批量标记多条高质量素材为已使用（避免素材堆积）
-                marked_count = self.executor.kb.mark_multiple_as_used(count=INSPIRATION_THRESHOLD)
-                self.recorder.log("info", f"🎨 [创作流程] 已批量标记 {len(marked_count)} 条素材为已使用")
+                marked_count = await self._run_io(self.executor.kb.mark_multiple_as_used, count=INSPIRATION_THRESHOLD)
+                self.recorder.log("info", "🎨 [创作流程] 已批量标记 %s 条素材为已使用", len(marked_count))
 
                 # 显示更新后的素材库统计
-                stats_after = self.executor.kb.get_stats()
+                stats_after = await self._run_io(self.executor.kb.get_stats)
                 self.recorder.log("info",
-                    f"📊 [素材库-更新] 总计:{stats_after['total']} | "
-                    f"未使用:{stats_after['unused']} | "
-                    f"高质量未使用:{stats_after['high_quality_unused']} | "
-                    f"已使用:{stats_after['used']}"
+                    "📊 [素材库-更新] 总计:%s | 未使用:%s | 高质量未使用:%s | 已使用:%s",
+                    stats_after['total'], stats_after['unused'], stats_after['high_quality_unused'], stats_after['used']
                 )
 
             # 3. 生图
-            await self.artist.open_studio()
-            image_path = await self.artist.generate_image(draft['image_prompt'])
-
-            # 生图后立即返回小红书环境（防止停留在即梦平台）
-            if image_path:
-                await self.artist.ensure_back_to_xhs()
+            try:
+                image_path = await asyncio.wait_for(
+                    self._generate_cover(draft['image_prompt']), timeout=_CREATION_STEP_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                self.recorder.log("error", "🎨 [创作流程] 生图超过 %ss，已放弃", _CREATION_STEP_TIMEOUT)
+                image_path = None
+                await self._back_to_xhs()  # 被取消的生图停在即梦页面上
 
             if not image_path:
                 self.recorder.log("error", "🎨 [创作流程] 生图失败，但继续保存草稿")
@@ -210,11 +224,18 @@ class Supervisor:
                 return
 
             # 5. 判断是否应该发布（在配置的发布时间点）
-            current_hour = datetime.now().hour
-            if current_hour in PUBLISH_HOURS:
+            current_hour = time.localtime().tm_hour
+            if current_hour in _PUBLISH_HOURS:
                 # 在发布时间点，尝试发布
                 self.recorder.log("info", f"📤 [发布流程] 当前时间 {current_hour} 点在发布时间点，尝试发布...")
-                publish_success = await self.publisher.publish_draft(draft)
+                try:
+                    publish_success = await asyncio.wait_for(
+                        self.publisher.publish_draft(draft), timeout=_CREATION_STEP_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    self.recorder.log("error", "📤 [发布流程] 发布超过 %ss，已放弃", _CREATION_STEP_TIMEOUT)
+                    publish_success = False
+                    await self._back_to_xhs()  # 被取消的发布停在创作者中心编辑页上
                 if publish_success:
                     self.writer.mark_draft_published(draft.get("created_at"))
                     self.recorder.log("success", "🎉 [创作流程] 创作+发布完成！")
@@ -228,89 +249,132 @@ class Supervisor:
             self.recorder.log("error", f"🎨 [创作流程] 创作流程异常: {e}")
             # 创作流程失败不影响主循环，继续浏览互动
     
+    async def _generate_cover(self, image_prompt: str):
+        """打开即梦生成配图，成功后回到小红书；返回图片路径，失败返回 None"""
+        await self.artist.open_studio()
+        image_path = await self.artist.generate_image(image_prompt)
+
+        # 生图后立即返回小红书环境（防止停留在即梦平台）
+        if image_path:
+            await self.artist.ensure_back_to_xhs()
+        return image_path
+
+    async def _back_to_xhs(self):
+        """生图/发布超时被取消后回到小红书首页（限时），后续浏览互动不会在别的站点上执行"""
+        try:
+            await asyncio.wait_for(self.bm.page.goto(BASE_URL), timeout=_DEEP_RECOVERY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.recorder.log("error", "🔄 返回小红书超过 %ss 未完成", _DEEP_RECOVERY_TIMEOUT)
+        except Exception as e:
+            self.recorder.log("error", "🔄 返回小红书失败: %s", e)
+
     async def _deep_recovery(self):
-        """深度恢复：刷新页面、重新初始化"""
+        """深度恢复：刷新页面、重新初始化（整体限时，避免页面卡死时主循环一直等待）"""
         try:
             self.recorder.log("info", "🔄 [深度恢复] 开始执行...")
-            await self.bm.page.reload()
-            await self.bm.page.wait_for_load_state("domcontentloaded")
-            await asyncio.sleep(3)
-
-            # 确保回到小红书首页
-            if "xiaohongshu.com" not in self.bm.page.url:
-                await self.bm.page.goto(BASE_URL)
-                await asyncio.sleep(2)
-
+            await asyncio.wait_for(self._reset_page(), timeout=_DEEP_RECOVERY_TIMEOUT)
             self.recorder.log("info", "🔄 [深度恢复] 完成，环境已重置")
+        except asyncio.TimeoutError:
+            self.recorder.log("error", "🔄 [深度恢复] 超过 %ss 未完成，已放弃", _DEEP_RECOVERY_TIMEOUT)
         except Exception as e:
             self.recorder.log("error", f"🔄 [深度恢复] 失败: {e}")
 
+    async def _reset_page(self):
+        """刷新当前页面并确保回到小红书首页"""
+        await self.bm.page.reload()
+        await self.bm.page.wait_for_load_state("domcontentloaded")
+        await asyncio.sleep(3)
+
+        # 确保回到小红书首页
+        if "xiaohongshu.com" not in self.bm.page.url:
+            await self.bm.page.goto(BASE_URL)
+            await asyncio.sleep(2)
+
     # === Phase 2 & 4: 数据分析方法 ===
 
     async def _perform_data_analysis(self):
-        """执行定期数据分析（每4小时）"""
-        try:
-            self.recorder.log("info", "📊 [数据分析] 开始执行定期分析...")
+        """执行定期数据分析（每4小时）
 
-            # 1. Phase 2: 获取爆款模式
-            if self.viral_analyzer:
-                self.viral_patterns = self.viral_analyzer.get_viral_patterns(top_n=10)
+        爆款模式分析与热点追踪互不依赖，并发执行；各自的阻塞调用放到专用线程池里，不卡住事件循环
+        """
+        self.recorder.log("info", "📊 [数据分析] 开始执行定期分析...")
+        results = await asyncio.gather(
+            self._phase2_analysis(), self._phase4_analysis(), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.recorder.log("error", "📊 [数据分析] 分析失败: %s", result)
+
+    async def _run_io(self, func, *args, **kwargs):
+        """在专用线程池里执行阻塞调用"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="supv-io")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, functools.partial(func, *args, **kwargs))
+
+    async def _phase2_analysis(self):
+        """Phase 2: 获取爆款模式"""
+        if not self.viral_analyzer:
+            return
 
-                if self.viral_patterns:
-                    self.recorder.log("info", "📊 [数据分析] 爆款模式分析完成")
+        self.viral_patterns = await self._run_io(self.viral_analyzer.get_viral_patterns, top_n=10)
+        self._cached_recs = tuple((self.viral_patterns or {}).get("recommendations", []))
 
-                    # 记录关键发现
-                    if "title_patterns" in self.viral_patterns:
-                        most_common = self.viral_patterns["title_patterns"].get("most_common_type", "")
-                        self.recorder.log("info", f"   - 最常见标题类型: {most_common}")
+        if self.viral_patterns:
+            self.recorder.log("info", "📊 [数据分析] 爆款模式分析完成")
 
-                    if "recommendations" in self.viral_patterns:
-                        self.recorder.log("info", "   - 优化建议已生成")
-                        for rec in self.viral_patterns["recommendations"][:3]:
-                            self.recorder.log("info", f"     * {rec}")
+            # 记录关键发现
+            if "title_patterns" in self.viral_patterns:
+                most_common = self.viral_patterns["title_patterns"].get("most_common_type", "")
+                self.recorder.log("info", "   - 最常见标题类型: %s", most_common)
 
-                    # 保存分析结果
-                    self.viral_analyzer.save_analysis(self.viral_patterns)
-                else:
-                    self.recorder.log("warning", "📊 [数据分析] 数据不足，无法生成模式")
-
-                # 获取高表现内容
-                top_posts = self.analytics.get_top_performing(limit=5)
-                if top_posts:
-                    self.recorder.log("info", f"📊 [数据分析] 找到 {len(top_posts)} 个高表现内容")
-
-            # 2. Phase 4: 分析热点趋势
-            if self.trend_tracker:
-                self.recorder.log("info", "🔥 [热点追踪] 开始分析热点趋势...")
-
-                # 清理过期热点
-                self.trend_tracker.cleanup_expired_trends()
-
-                # 获取当前热点
-                active_trends = self.trend_tracker.get_active_trends(limit=10)
-                if active_trends:
-                    self.recorder.log("info", f"🔥 [热点追踪] 当前热点数: {len(active_trends)}")
-
-                    # 获取热门话题
-                    hot_topics = self.trend_tracker.get_trending_topics(5)
-                    if hot_topics:
-                        self.recorder.log("info", f"🔥 [热点追踪] 热门话题:")
-                        for topic, score in hot_topics:
-                            self.recorder.log("info", f"   - {topic}: {score:.0f} 热度")
-
-                    # 分析热点模式
-                    trend_patterns = self.trend_tracker.analyze_trend_patterns()
-                    if "title_patterns" in trend_patterns:
-                        self.recorder.log("info", f"🔥 [热点追踪] 标题模式分布: {trend_patterns['title_patterns']}")
-
-                    # 打印热点摘要
-                    summary = self.trend_tracker.get_trend_summary()
-                    self.recorder.log("info", f"\n{summary}")
-                else:
-                    self.recorder.log("info", "🔥 [热点追踪] 暂无热点数据")
+            if "recommendations" in self.viral_patterns:
+                self.recorder.log("info", "   - 优化建议已生成")
+                for rec in self.viral_patterns["recommendations"][:3]:
+                    self.recorder.log("info", "     * %s", rec)
 
-        except Exception as e:
-            self.recorder.log("error", f"📊 [数据分析] 分析失败: {e}")
+            # 保存分析结果
+            await self._run_io(self.viral_analyzer.save_analysis, self.viral_patterns)
+        else:
+            self.recorder.log("warning", "📊 [数据分析] 数据不足，无法生成模式")
+
+        # 获取高表现内容
+        top_posts = await self._run_io(self.analytics.get_top_performing, limit=5)
+        if top_posts:
+            self.recorder.log("info", "📊 [数据分析] 找到 %s 个高表现内容", len(top_posts))
+
+    async def _phase4_analysis(self):
+        """Phase 4: 分析热点趋势"""
+        if not self.trend_tracker:
+            return
+
+        self.recorder.log("info", "🔥 [热点追踪] 开始分析热点趋势...")
+
+        # 清理过期热点
+        await self._run_io(self.trend_tracker.cleanup_expired_trends)
+
+        # 获取当前热点
+        active_trends = await self._run_io(self.trend_tracker.get_active_trends, limit=10)
+        if active_trends:
+            self.recorder.log("info", "🔥 [热点追踪] 当前热点数: %s", len(active_trends))
+
+            # 获取热门话题
+            hot_topics = await self._run_io(self.trend_tracker.get_trending_topics, 5)
+            if hot_topics:
+                self.recorder.log("info", "🔥 [热点追踪] 热门话题:")
+                for topic, score in hot_topics:
+                    self.recorder.log("info", "   - %s: %.0f 热度", topic, score)
+
+            # 分析热点模式
+            trend_patterns = await self._run_io(self.trend_tracker.analyze_trend_patterns)
+            if "title_patterns" in trend_patterns:
+                self.recorder.log("info", "🔥 [热点追踪] 标题模式分布: %s", trend_patterns['title_patterns'])
+
+            # 打印热点摘要
+            summary = await self._run_io(self.trend_tracker.get_trend_summary)
+            self.recorder.log("info", "\n%s", summary)
+        else:
+            self.recorder.log("info", "🔥 [热点追踪] 暂无热点数据")
 
     def get_viral_insights(self) -> Dict:
         """获取当前爆款模式洞察（供内容创作使用）"""
@@ -318,8 +382,7 @@ class Supervisor:
 
     def get_content_recommendations(self) -> List[str]:
         """获取内容创作建议"""
-        insights = self.get_viral_insights()
-        return insights.get("recommendations", [])
+        return list(self._cached_recs)
 
     # === Phase 4: 热点追踪方法 ===
 
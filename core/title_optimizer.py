@@ -10,9 +10,20 @@
 
 import random
 import re
+import threading
 from typing import List, Dict
 from core.llm_client import LLMClient
 
+# 预编译的正则：避免每次调用重新查找/编译
+_CJK_WORD_RE = re.compile(r'[\u4e00-\u9fa5]{2,4}')
+_EMOJI_RE = re.compile(r'[😭😍🤯🔥⚡✨💡🚀]')
+_TAIL_EMOJIS = ("🔥", "⚡", "✨", "🚀")  # 标题没有表情时补在末尾的候选
+# 常见关键词：(原词, 小写形式)，小写只算一次
+_COMMON_KEYWORDS = tuple(
+    (k, k.lower())
+    for k in ("AI工具", "AI", "插件", "浏览器", "效率", "写作", "绘图", "自动化", "神器", "推荐")
+)
+
 
 class TitleOptimizer:
     """小红书标题优化器"""
@@ -21,6 +32,7 @@ class TitleOptimizer:
         self.recorder = recorder
         # LLM client 延迟初始化，只在需要时创建
         self.llm = None
+        self._rng = random.Random()  # 实例独享的随机数生成器，批量生成 A/B 标题时不争用全局 random
 
         # 爆款标题模板库
         self.templates = {
@@ -68,6 +80,16 @@ class TitleOptimizer:
             ],
         }
 
+        # 模板按类型预先转成元组，类别 -> 可选模板类型的路由表也只建一次
+        self._templates_by_cat = {cat: tuple(v) for cat, v in self.templates.items()}
+        self._cat_names = tuple(self.templates)
+        self._cat_routes = {
+            "工具推荐": ("数字型", "情感型", "对比型"),
+            "使用教程": ("干货型", "疑问型"),
+            "避坑指南": ("痛点型", "干货型"),
+        }
+        self._alt_cats = self._cat_names[:4]  # 备选标题取前4种类型
+
         # 情感化前缀
         self.emotional_prefixes = [
             "😭", "😍", "🤯", "🔥", "⚡", "✨", "💡", "🚀",
@@ -80,6 +102,18 @@ class TitleOptimizer:
             "建议收藏", "错过后悔", "手慢无"
         ]
 
+        # 评分用的合并正则：一次 finditer 同时统计数字、表情、情感词、紧迫词和疑问词
+        # （各类词之间互不包含也不首尾重叠，按词去重后即等于“出现了几个不同的词”；
+        #  表情同时也是情感前缀，由 emoji 分组统一匹配后再计入情感词）
+        self._emotion_set = frozenset(self.emotional_prefixes)
+        self._score_re = re.compile(
+            r"(?P<digit>\d+)"
+            r"|(?P<emoji>[😭😍🤯🔥⚡✨💡🚀])"
+            f"|(?P<emotion>{'|'.join(map(re.escape, self.emotional_prefixes))})"
+            f"|(?P<urgency>{'|'.join(map(re.escape, self.urgency_words))})"
+            r"|(?P<q>吗|怎么|\?)"
+        )
+
     def optimize_title(self, original_title: str, content_summary: str = "") -> Dict:
         """
         优化标题
@@ -118,25 +152,15 @@ class TitleOptimizer:
 
     def _extract_keywords(self, title: str) -> List[str]:
         """从标题中提取关键词"""
-        # 常见关键词
-        common_keywords = [
-            "AI工具", "AI", "插件", "浏览器", "效率",
-            "写作", "绘图", "自动化", "神器", "推荐"
-        ]
-
-        keywords = []
         title_lower = title.lower()
-
-        for keyword in common_keywords:
-            if keyword.lower() in title_lower:
-                keywords.append(keyword)
+        keywords = [keyword for keyword, keyword_lower in _COMMON_KEYWORDS if keyword_lower in title_lower]
 
         # 如果没有找到常见关键词，提取主要名词
         if not keywords:
             # 简单提取：提取2-4个字的词组
-            words = re.findall(r'[\u4e00-\u9fa5]{2,4}', title)
-            if words:
-                keywords.append(words[0])
+            m = _CJK_WORD_RE.search(title)
+            if m:
+                keywords.append(m.group(0))
 
         return keywords[:3]  # 最多返回3个关键词
 
@@ -161,22 +185,12 @@ class TitleOptimizer:
         keyword = keywords[0]  # 使用第一个关键词
 
         # 根据类别选择模板
-        if category == "工具推荐":
-            template_type = random.choice(["数字型", "情感型", "对比型"])
-        elif category == "使用教程":
-            template_type = random.choice(["干货型", "疑问型"])
-        elif category == "避坑指南":
-            template_type = random.choice(["痛点型", "干货型"])
-        else:
-            template_type = random.choice(list(self.templates.keys()))
-
-        # 获取模板
-        templates = self.templates.get(template_type, self.templates["数字型"])
-        template = random.choice(templates)
+        template_type = self._rng.choice(self._cat_routes.get(category, self._cat_names))
+        template = self._rng.choice(self._templates_by_cat[template_type])
 
         # 填充模板
         if "{数字}" in template:
-            number = random.randint(3, 10)
+            number = self._rng.randint(3, 10)
             title = template.format(关键词=keyword, 数字=number)
         else:
             title = template.format(关键词=keyword)
@@ -196,15 +210,13 @@ class TitleOptimizer:
         keyword = keywords[0]
 
         # 从不同类型模板中生成
-        template_types = list(self.templates.keys())[:4]  # 取前4种类型
-
-        for template_type in template_types:
-            templates = self.templates.get(template_type, [])
+        for template_type in self._alt_cats:
+            templates = self._templates_by_cat[template_type]
             if templates:
-                template = random.choice(templates)
+                template = self._rng.choice(templates)
 
                 if "{数字}" in template:
-                    number = random.randint(3, 10)
+                    number = self._rng.randint(3, 10)
                     title = template.format(关键词=keyword, 数字=number)
                 else:
                     title = template.format(关键词=keyword)
@@ -217,19 +229,19 @@ class TitleOptimizer:
     def _add_emotion_and_urgency(self, title: str) -> str:
         """添加情感和紧迫性元素"""
         # 30% 概率添加前缀
-        if random.random() < 0.3:
-            prefix = random.choice(self.emotional_prefixes)
+        if self._rng.random() < 0.3:
+            prefix = self._rng.choice(self.emotional_prefixes)
             title = f"{prefix} {title}"
 
         # 20% 概率添加紧迫性词汇
-        if random.random() < 0.2:
-            urgency = random.choice(self.urgency_words)
+        if self._rng.random() < 0.2:
+            urgency = self._rng.choice(self.urgency_words)
             if not title.endswith(urgency):
                 title = f"{title}{urgency}！"
 
         # 添加表情符号（如果没有）
-        if not any(emoji in title for emoji in ["😭", "😍", "🤯", "🔥", "⚡", "✨", "💡", "🚀"]):
-            emoji = random.choice(["🔥", "⚡", "✨", "🚀"])
+        if not _EMOJI_RE.search(title):
+            emoji = self._rng.choice(_TAIL_EMOJIS)
             title = f"{title}{emoji}"
 
         return title
@@ -245,35 +257,44 @@ class TitleOptimizer:
         - 紧迫性词汇
         - 疑问句式
         """
-        score = 0.0
-
-        # 1. 长度评分（15-25字最佳）
+        # 1. 长度评分（15-25字最佳，10-30字次之，过短保底，过长不得分）
         length = len(title)
-        if 15 <= length <= 25:
-            score += 30
-        elif 10 <= length < 15 or 25 < length <= 30:
-            score += 20
-        elif length < 10:
-            score += 10
+        score = float(30 if 15 <= length <= 25 else 20 if 10 <= length <= 30 else 10 if length < 10 else 0)
+
+        # 2-6 项只扫描标题一次
+        has_digit = has_question = False
+        emotions, urgencies = set(), set()
+        emoji_count = 0
+        for m in self._score_re.finditer(title):
+            kind = m.lastgroup
+            if kind == "emoji":
+                emoji_count += 1
+                if m.group() in self._emotion_set:
+                    emotions.add(m.group())
+            elif kind == "emotion":
+                emotions.add(m.group())
+            elif kind == "urgency":
+                urgencies.add(m.group())
+            elif kind == "digit":
+                has_digit = True
+            else:
+                has_question = True
 
         # 2. 数字评分
-        if re.search(r'\d+', title):
+        if has_digit:
             score += 20
 
         # 3. 情感词汇评分
-        emotion_count = sum(1 for word in self.emotional_prefixes if word in title)
-        score += min(emotion_count * 10, 20)
+        score += min(len(emotions) * 10, 20)
 
         # 4. 紧迫性词汇评分
-        urgency_count = sum(1 for word in self.urgency_words if word in title)
-        score += min(urgency_count * 5, 15)
+        score += min(len(urgencies) * 5, 15)
 
         # 5. 疑问句式评分
-        if "?" in title or "吗" in title or "怎么" in title:
+        if has_question:
             score += 10
 
         # 6. 表情符号评分
-        emoji_count = len(re.findall(r'[😭😍🤯🔥⚡✨💡🚀]', title))
         score += min(emoji_count * 5, 10)
 
         return min(score, 100)  # 最高100分
@@ -306,15 +327,21 @@ class TitleOptimizer:
         return ab_titles
 
 
+_default_optimizer = None
+_default_optimizer_lock = threading.Lock()
+
+
 # 便捷函数
 def optimize_title(title: str, content_summary: str = "") -> str:
-    """便捷的标题优化函数"""
-    from core.recorder import SessionRecorder
+    """便捷的标题优化函数（首次调用时创建共享的 TitleOptimizer，之后复用）"""
+    global _default_optimizer
+    with _default_optimizer_lock:
+        if _default_optimizer is None:
+            from core.recorder import SessionRecorder
 
-    recorder = SessionRecorder()
-    optimizer = TitleOptimizer(recorder)
+            _default_optimizer = TitleOptimizer(SessionRecorder())
 
-    result = optimizer.optimize_title(title, content_summary)
+    result = _default_optimizer.optimize_title(title, content_summary)
     return result["optimized"]
 
 
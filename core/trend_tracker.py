@@ -9,21 +9,54 @@
 """
 
 import json
+import os
+import re
+import threading
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, List, Optional
 from collections import Counter
 from config.settings import DATA_DIR
 
+TRENDS_COMPACT_RATIO = 4  # 日志行数超过存活记录数的几倍时整体重写（压缩）一次
+TRENDS_COMPACT_MIN_LINES = 200  # 日志行数少于该值时不压缩
+
+# 话题关键词（常见 AI 工具相关）合成一个正则，一次扫描找出全部命中
+# （关键词之间互不包含也不首尾重叠，findall 结果与逐个 in 判断一致）
+_TOPIC_RE = re.compile("|".join(map(re.escape, [
+    "AI", "ChatGPT", "插件", "工具", "神器",
+    "效率", "自动化", "办公", "浏览器",
+    "免费", "推荐", "教程",
+    "避坑", "合集", "测评"
+])))
+# 标题模式中按关键词判断的几类
+_TITLE_WORD_PATTERNS = {
+    "情感型": re.compile("绝了|太香|相见恨晚|真香"),
+    "推荐型": re.compile("推荐|神器|必备"),
+    "干货型": re.compile("教程|攻略|保姆级"),
+}
+
 
 class TrendTracker:
     """热点趋势追踪器"""
 
     def __init__(self, recorder):
         self.recorder = recorder
-        self.trends_file = DATA_DIR / "trends.json"
-        self._ensure_file()
+        # 追加写的 JSONL 日志：新热点写整条记录，更新只追加变化的字段，读取时按 url 合并
+        self.trends_file = DATA_DIR / "trends.jsonl"
+        self._legacy_file = DATA_DIR / "trends.json"  # 旧版整文件 JSON，首次启动时迁移
+        # 分析在线程池里执行、记录热点在事件循环里执行，共享的内存数据需要加锁
+        self._lock = threading.RLock()
+        self._by_url: Dict[str, Dict] = {}  # url -> 热点记录（保持写入顺序），用于查重
+        self._by_id: Dict[str, Dict] = {}  # id -> 热点记录（id 重复时取最早的一条），用于标记使用
+        # url -> collected_at 对应的时间戳；只在内存里缓存，避免每次过期判断都 strptime
+        self._collected_ts: Dict[str, float] = {}
+        self._log_lines = 0  # 日志文件当前行数，用于判断何时压缩
+        # 按热度排序的全部活跃热点：(trend_ttl, 有效截止时间戳, 列表)；任何写入都会使其失效，
+        # 否则一直用到列表中最早的热点过期为止（摘要/分析一次会连续读取多次）
+        self._active_cache: Optional[tuple] = None
+        self._load()
 
         # 热点阈值配置
         self.hot_thresholds = {
@@ -36,24 +69,74 @@ class TrendTracker:
         # 趋势时效（小时）
         self.trend_ttl = 72  # 热点保留3天
 
-    def _ensure_file(self):
-        """确保趋势文件存在"""
+    def _load(self):
+        """读取 JSONL 日志到内存（同一 url 的后续行覆盖前面的字段）；只有旧版 trends.json 时先迁移"""
         if not self.trends_file.exists():
-            with open(self.trends_file, 'w', encoding='utf-8') as f:
-                json.dump([], f)
-
-    def _load_data(self) -> List[Dict]:
-        """加载趋势数据"""
+            for item in self._load_legacy():
+                self._by_url[item.get("url")] = item
+            self._reindex_ids()
+            self._compact()
+            return
+
+        with open(self.trends_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 写入中途被中断的残行
+                self._log_lines += 1
+                url = record.get("url")
+                existing = self._by_url.get(url)
+                if existing is None:
+                    self._by_url[url] = record
+                else:
+                    existing.update(record)
+        self._reindex_ids()
+
+    def _reindex_ids(self):
+        """按记录顺序重建 id 索引"""
+        self._by_id = {}
+        for item in self._by_url.values():
+            self._by_id.setdefault(item.get("id"), item)
+
+    def _collected_at_ts(self, item: Dict) -> float:
+        """记录的采集时间戳（首次用到时解析一次 collected_at）"""
+        url = item.get("url")
+        ts = self._collected_ts.get(url)
+        if ts is None:
+            ts = time.mktime(time.strptime(item["collected_at"], "%Y-%m-%d %H:%M:%S"))
+            self._collected_ts[url] = ts
+        return ts
+
+    def _load_legacy(self) -> List[Dict]:
+        """读取旧版 trends.json（整文件 JSON 数组）"""
         try:
-            with open(self.trends_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
+            with open(self._legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, list) else []
+        except Exception:
             return []
 
-    def _save_data(self, data: List[Dict]):
-        """保存趋势数据"""
-        with open(self.trends_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    def _append(self, *records: Dict):
+        """向日志追加若干行（整条记录或带 url 的字段补丁），必要时压缩"""
+        with open(self.trends_file, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        self._log_lines += len(records)
+        self._active_cache = None
+        if self._log_lines > max(TRENDS_COMPACT_MIN_LINES, TRENDS_COMPACT_RATIO * len(self._by_url)):
+            self._compact()
+
+    def _compact(self):
+        """用内存中的最新记录重写日志（先写临时文件再替换，中途失败不损坏原文件）"""
+        tmp_file = self.trends_file.with_name(self.trends_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in self._by_url.values())
+        os.replace(tmp_file, self.trends_file)
+        self._log_lines = len(self._by_url)
+        self._active_cache = None
 
     def is_hot_post(self, likes: int, collects: int, comments: int, views: int) -> bool:
         """
@@ -112,41 +195,44 @@ class TrendTracker:
             if not self.is_hot_post(likes, collects, comments, views):
                 return False
 
-            # 查重
-            data = self._load_data()
-            for item in data:
-                if item.get("url") == url:
-                    self.recorder.log("info", f"🔥 [热点追踪] 热点已存在，更新数据")
-                    # 更新互动数据
-                    item["likes"] = likes
-                    item["collects"] = collects
-                    item["comments"] = comments
-                    item["views"] = views
-                    item["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    self._save_data(data)
-                    return True
-
-            # 创建新记录
+            # 先在锁外构造新记录，查重和写入放在同一次加锁里，避免并发记录同一 url 时重复入库
+            now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            stats = {
+                "likes": likes,
+                "collects": collects,
+                "comments": comments,
+                "views": views
+            }
+            trend_score = self._calculate_trend_score(likes, collects, comments, views)
             trend_record = {
                 "id": str(int(time.time())),
-                "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "collected_at": now_str,
                 "title": title,
                 "content": content,
                 "url": url,
                 "image_urls": image_urls or [],
-                "stats": {
-                    "likes": likes,
-                    "collects": collects,
-                    "comments": comments,
-                    "views": views
-                },
-                "trend_score": self._calculate_trend_score(likes, collects, comments, views),
+                "stats": stats,
+                "trend_score": trend_score,
                 "topics": self._extract_topics(title, content),
                 "status": "active"  # active, used, expired
             }
 
-            data.append(trend_record)
-            self._save_data(data)
+            with self._lock:
+                # 查重
+                item = self._by_url.get(url)
+                if item is not None:
+                    self.recorder.log("info", f"🔥 [热点追踪] 热点已存在，更新数据")
+                    # 更新互动数据并重算热度，读取方直接按存储的 trend_score 排序；只追加变化的字段
+                    # （标题和正文不会更新，topics 保持入库时的结果）
+                    patch = {"stats": stats, "trend_score": trend_score, "updated_at": now_str}
+                    item.update(patch)
+                    self._append({"url": url, **patch})
+                    return True
+
+                # 创建新记录
+                self._by_url[url] = trend_record
+                self._by_id.setdefault(trend_record["id"], trend_record)
+                self._append(trend_record)
 
             self.recorder.log("info", f"🔥 [热点追踪] +1 新热点: 《{title[:30]}》")
             self.recorder.log("info", f"   互动: 👍{likes} ⭐{collects} 💬{comments} 👁️{views}")
@@ -173,47 +259,44 @@ class TrendTracker:
 
     def _extract_topics(self, title: str, content: str) -> List[str]:
         """提取话题标签"""
-        topics = []
-
-        # 常见 AI 工具相关关键词
-        keywords = [
-            "AI", "ChatGPT", "插件", "工具", "神器",
-            "效率", "自动化", "办公", "浏览器",
-            "免费", "神器", "推荐", "教程",
-            "避坑", "合集", "测评"
-        ]
-
-        text = title + " " + content
-        for keyword in keywords:
-            if keyword in text:
-                topics.append(keyword)
-
-        return list(set(topics))  # 去重
+        # 去重并保持首次出现的顺序
+        return list(dict.fromkeys(_TOPIC_RE.findall(title + " " + content)))
 
     def get_active_trends(self, limit: int = 10) -> List[Dict]:
         """获取活跃热点"""
         try:
-            data = self._load_data()
-
-            # 过滤活跃热点
-            active = []
-            for item in data:
-                if item.get("status") != "active":
-                    continue
+            with self._lock:
+                cache = self._active_cache
+                if cache is not None and cache[0] == self.trend_ttl and time.time() <= cache[1]:
+                    return cache[2][:limit]
+
+                # 过滤活跃热点
+                active = []
+                expired_patches = []
+                ttl_seconds = self.trend_ttl * 3600
+                cutoff_ts = time.time() - ttl_seconds
+                valid_until = float("inf")
+                for item in self._by_url.values():
+                    if item.get("status") != "active":
+                        continue
 
-                # 检查是否过期
-                collected_at = datetime.strptime(item["collected_at"], "%Y-%m-%d %H:%M:%S")
-                if datetime.now() - collected_at > timedelta(hours=self.trend_ttl):
-                    item["status"] = "expired"
-                    continue
+                    # 检查是否过期
+                    collected_ts = self._collected_at_ts(item)
+                    if collected_ts < cutoff_ts:
+                        item["status"] = "expired"
+                        expired_patches.append({"url": item.get("url"), "status": "expired"})
+                        continue
 
-                active.append(item)
+                    active.append(item)
+                    valid_until = min(valid_until, collected_ts + ttl_seconds)
 
-            # 更新过期状态
-            self._save_data(data)
+                # 更新过期状态（只追加状态发生变化的记录）
+                if expired_patches:
+                    self._append(*expired_patches)
 
-            # 按热度评分排序
-            active.sort(key=lambda x: x.get("trend_score", 0), reverse=True)
+                # 按热度评分排序
+                active.sort(key=lambda x: x.get("trend_score", 0), reverse=True)
+                self._active_cache = (self.trend_ttl, valid_until, active)
 
             return active[:limit]
 
@@ -296,68 +379,55 @@ class TrendTracker:
         if not trends:
             return {"message": "暂无热点数据"}
 
+        # 一次遍历同时累计互动数据、话题热度、标题模式和内容主题
+        likes = collects = comments = 0
+        topic_scores = Counter()
+        theme_counter = Counter()
+        title_patterns = dict.fromkeys(("数字型", "疑问型", "情感型", "推荐型", "干货型"), 0)
+        for t in trends:
+            stats = t["stats"]
+            likes += stats["likes"]
+            collects += stats["collects"]
+            comments += stats["comments"]
+
+            topics = t.get("topics", [])
+            score = t.get("trend_score", 0)
+            for topic in topics:
+                topic_scores[topic] += score
+            theme_counter.update(topics)
+
+            title = t["title"]
+            if any(char.isdigit() for char in title):
+                title_patterns["数字型"] += 1
+            if "？" in title:
+                title_patterns["疑问型"] += 1
+            for name, pattern in _TITLE_WORD_PATTERNS.items():
+                if pattern.search(title):
+                    title_patterns[name] += 1
+
+        n = len(trends)
         analysis = {
-            "total_trends": len(trends),
-            "avg_likes": sum(t["stats"]["likes"] for t in trends) // len(trends),
-            "avg_collects": sum(t["stats"]["collects"] for t in trends) // len(trends),
-            "avg_comments": sum(t["stats"]["comments"] for t in trends) // len(trends),
-            "top_topics": self.get_trending_topics(5),
-            "title_patterns": self._analyze_title_patterns(trends),
-            "content_themes": self._analyze_content_themes(trends)
+            "total_trends": n,
+            "avg_likes": likes // n,
+            "avg_collects": collects // n,
+            "avg_comments": comments // n,
+            "top_topics": topic_scores.most_common(5),  # 与 get_trending_topics(5) 相同口径
+            "title_patterns": title_patterns,
+            "content_themes": dict(theme_counter.most_common(5))
         }
 
         return analysis
 
-    def _analyze_title_patterns(self, trends: List[Dict]) -> Dict:
-        """分析标题模式"""
-        patterns = {
-            "数字型": 0,
-            "疑问型": 0,
-            "情感型": 0,
-            "推荐型": 0,
-            "干货型": 0
-        }
-
-        for trend in trends:
-            title = trend["title"]
-
-            if any(char.isdigit() for char in title):
-                patterns["数字型"] += 1
-            if "？" in title or "？" in title:
-                patterns["疑问型"] += 1
-            if any(word in title for word in ["绝了", "太香", "相见恨晚", "真香"]):
-                patterns["情感型"] += 1
-            if any(word in title for word in ["推荐", "神器", "必备"]):
-                patterns["推荐型"] += 1
-            if any(word in title for word in ["教程", "攻略", "保姆级"]):
-                patterns["干货型"] += 1
-
-        return patterns
-
-    def _analyze_content_themes(self, trends: List[Dict]) -> Dict:
-        """分析内容主题"""
-        theme_counter = Counter()
-
-        for trend in trends:
-            topics = trend.get("topics", [])
-            for topic in topics:
-                theme_counter[topic] += 1
-
-        return dict(theme_counter.most_common(5))
-
     def mark_trend_used(self, trend_id: str):
         """标记热点已使用"""
         try:
-            data = self._load_data()
-
-            for item in data:
-                if item.get("id") == trend_id:
+            with self._lock:
+                item = self._by_id.get(trend_id)
+                if item is not None:
                     item["status"] = "used"
                     item["used_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    self._append({"url": item.get("url"), "status": "used", "used_at": item["used_at"]})
                     self.recorder.log("info", f"🔥 [热点追踪] 热点已标记为使用")
-                    break
-
-            self._save_data(data)
 
         except Exception as e:
             self.recorder.log("error", f"🔥 [热点追踪] 标记失败: {e}")
@@ -365,22 +435,26 @@ class TrendTracker:
     def cleanup_expired_trends(self):
         """清理过期热点"""
         try:
-            data = self._load_data()
-            original_count = len(data)
-
-            # 过滤掉过期且已使用的
-            active_data = []
-            for item in data:
-                if item.get("status") == "expired":
-                    # 已过期且超过7天的删除
-                    collected_at = datetime.strptime(item["collected_at"], "%Y-%m-%d %H:%M:%S")
-                    if datetime.now() - collected_at > timedelta(days=7):
-                        continue
-                active_data.append(item)
-
-            if len(active_data) < original_count:
-                self._save_data(active_data)
-                self.recorder.log("info", f"🔥 [热点追踪] 清理了 {original_count - len(active_data)} 条过期热点")
+            with self._lock:
+                original_count = len(self._by_url)
+
+                # 过滤掉过期且已使用的
+                active_data = {}
+                cutoff_ts = time.time() - 7 * 86400
+                for url, item in self._by_url.items():
+                    if item.get("status") == "expired":
+                        # 已过期且超过7天的删除
+                        if self._collected_at_ts(item) < cutoff_ts:
+                            self._collected_ts.pop(url, None)
+                            continue
+                    active_data[url] = item
+
+                if len(active_data) < original_count:
+                    # 删除记录无法用追加表达，直接重写日志
+                    self._by_url = active_data
+                    self._reindex_ids()
+                    self._compact()
+                    self.recorder.log("info", f"🔥 [热点追踪] 清理了 {original_count - len(active_data)} 条过期热点")
 
         except Exception as e:
             self.recorder.log("error", f"🔥 [热点追踪] 清理失败: {e}")
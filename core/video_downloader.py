@@ -5,6 +5,7 @@
 import asyncio
 import json
 import re
+import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
@@ -14,6 +15,14 @@ try:
 except ImportError:
     raise SystemExit("缺少依赖: httpx. 安装命令: pip install httpx")
 
+DOWNLOAD_CHUNK_SIZE = 256 * 1024  # 256 KiB，减少 async for 的迭代次数
+PROGRESS_INTERVAL = 1.0  # 下载进度最多每秒打印一次
+
+_STATE_MARKER = "window.__INITIAL_STATE__"
+_STATE_ASSIGN_RE = re.compile(r'\s*=\s*(?=\{)')
+_UNDEFINED_RE = re.compile(r'\bundefined\b')
+_JSON_DECODER = json.JSONDecoder()
+
 
 @dataclass
 class VideoInfo:
@@ -101,63 +110,76 @@ class VideoDownloader:
                 print(f"❌ 笔记信息为空: {note_id}")
                 return None
 
-            # 提取视频流
-            streams = (
-                note_info.get("video", {})
-                .get("media", {})
-                .get("stream", {})
-            ) or {}
+            return self.build_video_info(note_id, note_info)
 
-            # 优先使用 h264
-            video_url = None
-            video_meta = {}
-
-            for codec_key in ("h264", "av1", "h265"):
-                codec_data = streams.get(codec_key)
-                if not codec_data:
-                    continue
-
-                # 处理列表
-                if isinstance(codec_data, list) and len(codec_data) > 0:
-                    video_meta = codec_data[0]
-                    video_url = video_meta.get("mediaUrl") or video_meta.get("masterUrl")
-                    if video_url:
-                        break
-
-                # 处理字典
-                elif isinstance(codec_data, dict):
-                    # 有时是 {quality: [videos]}
-                    for quality_videos in codec_data.values():
-                        if isinstance(quality_videos, list) and len(quality_videos) > 0:
-                            video_meta = quality_videos[0]
-                            video_url = video_meta.get("mediaUrl") or video_meta.get("masterUrl")
-                            if video_url:
-                                break
-                    if video_url:
-                        break
-
-            if not video_url:
-                print(f"⚠️  未找到视频 URL: {note_id}")
-                return None
+        except Exception as e:
+            print(f"❌ 提取视频信息失败: {e}")
+            return None
 
-            # 提取标题
-            title = note_info.get("title", "") or note_info.get("desc", "")[:50] or f"video_{note_id}"
+    def build_video_info(self, note_id: str, note_info: Dict[str, Any]) -> Optional[VideoInfo]:
+        """
+        从笔记数据（__INITIAL_STATE__ 中的 note 对象）构建视频信息
 
-            # 创建 VideoInfo
-            return VideoInfo(
-                note_id=note_id,
-                title=title,
-                video_url=video_url,
-                filesize=video_meta.get("size"),
-                duration=video_meta.get("duration", 0) / 1000.0 if video_meta.get("duration") else None,
-                width=video_meta.get("width"),
-                height=video_meta.get("height"),
-            )
+        Args:
+            note_id: 笔记 ID
+            note_info: 笔记数据，至少包含 video.media.stream
 
-        except Exception as e:
-            print(f"❌ 提取视频信息失败: {e}")
+        Returns:
+            VideoInfo 或 None（如果没有可用视频流）
+        """
+        # 提取视频流
+        streams = (
+            note_info.get("video", {})
+            .get("media", {})
+            .get("stream", {})
+        ) or {}
+
+        # 优先使用 h264
+        video_url = None
+        video_meta = {}
+
+        for codec_key in ("h264", "av1", "h265"):
+            codec_data = streams.get(codec_key)
+            if not codec_data:
+                continue
+
+            # 处理列表
+            if isinstance(codec_data, list) and len(codec_data) > 0:
+                video_meta = codec_data[0]
+                video_url = video_meta.get("mediaUrl") or video_meta.get("masterUrl")
+                if video_url:
+                    break
+
+            # 处理字典
+            elif isinstance(codec_data, dict):
+                # 有时是 {quality: [videos]}
+                for quality_videos in codec_data.values():
+                    if isinstance(quality_videos, list) and len(quality_videos) > 0:
+                        video_meta = quality_videos[0]
+                        video_url = video_meta.get("mediaUrl") or video_meta.get("masterUrl")
+                        if video_url:
+                            break
+                if video_url:
+                    break
+
+        if not video_url:
+            print(f"⚠️  未找到视频 URL: {note_id}")
             return None
 
+        # 提取标题
+        title = note_info.get("title", "") or note_info.get("desc", "")[:50] or f"video_{note_id}"
+
+        # 创建 VideoInfo
+        return VideoInfo(
+            note_id=note_id,
+            title=title,
+            video_url=video_url,
+            filesize=video_meta.get("size"),
+            duration=video_meta.get("duration", 0) / 1000.0 if video_meta.get("duration") else None,
+            width=video_meta.get("width"),
+            height=video_meta.get("height"),
+        )
+
     def _extract_initial_state(self, webpage: str) -> Optional[Dict[str, Any]]:
         """
         从网页中提取 window.__INITIAL_STATE__
@@ -168,16 +190,37 @@ class VideoDownloader:
         Returns:
             初始状态字典或 None
         """
-        # 查找 window.__INITIAL_STATE__ = {...}
-        match = re.search(r'window\.__INITIAL_STATE__\s*=\s*(\{.+?\})\s*</script>', webpage, re.DOTALL)
-        if not match:
+        # 查找 window.__INITIAL_STATE__ = {...}：先用字面量定位，不让正则在整页上回溯
+        brace = -1
+        pos = webpage.find(_STATE_MARKER)
+        while pos != -1:
+            assign = _STATE_ASSIGN_RE.match(webpage, pos + len(_STATE_MARKER))
+            if assign:
+                brace = assign.end()
+                break
+            pos = webpage.find(_STATE_MARKER, pos + 1)
+        if brace == -1:
             return None
 
-        js_obj = match.group(1)
+        # 合法 JSON 时解码器读到对象结束即返回，无需再找 </script>
+        try:
+            return _JSON_DECODER.raw_decode(webpage, brace)[0]
+        except json.JSONDecodeError:
+            pass
+
+        # 含 undefined 等 JS 写法：截到对象后第一个 </script>（与原正则 {.+?}\s*</script> 一致）
+        end = webpage.find("</script>", brace)
+        while end != -1:
+            js_obj = webpage[brace:end].rstrip()
+            if len(js_obj) > 1 and js_obj.endswith("}"):
+                break
+            end = webpage.find("</script>", end + 1)
+        if end == -1:
+            return None
 
-        # 清理 JS 对象
+        # 清理 JS 对象（只处理截出的片段）
         # 替换 undefined -> null
-        js_obj = re.sub(r'\bundefined\b', 'null', js_obj)
+        js_obj = _UNDEFINED_RE.sub('null', js_obj)
 
         # 尝试解析 JSON
         try:
@@ -231,17 +274,23 @@ class VideoDownloader:
                     total_size = int(response.headers.get("content-length", 0))
                     downloaded_size = 0
 
-                    # 写入文件
-                    with open(filepath, "wb") as f:
-                        async for chunk in response.aiter_bytes(chunk_size=8192):
+                    # 写入文件（磁盘写入放到线程里，慢盘不阻塞事件循环）
+                    f = await asyncio.to_thread(open, filepath, "wb")
+                    try:
+                        last_progress = time.monotonic()
+                        async for chunk in response.aiter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
                             if chunk:
-                                f.write(chunk)
+                                await asyncio.to_thread(f.write, chunk)
                                 downloaded_size += len(chunk)
 
-                                # 打印进度（每 1MB 打印一次）
-                                if downloaded_size % (1024 * 1024) < 8192:
+                                # 打印进度（按时间节流）
+                                now = time.monotonic()
+                                if now - last_progress >= PROGRESS_INTERVAL:
+                                    last_progress = now
                                     progress = downloaded_size / total_size * 100 if total_size > 0 else 0
                                     print(f"   进度: {downloaded_size / 1024 / 1024:.1f}MB / {total_size / 1024 / 1024:.1f}MB ({progress:.1f}%)")
+                    finally:
+                        await asyncio.to_thread(f.close)
 
             print(f"✅ 下载完成: {filename} ({downloaded_size / 1024 / 1024:.2f}MB)")
             video_info.local_path = str(filepath)
@@ -269,7 +318,18 @@ class VideoDownloader:
         if not video_info:
             return None
 
-        # 下载视频
+        return await self.download(video_info)
+
+    async def download(self, video_info: VideoInfo) -> Optional[Dict[str, Any]]:
+        """
+        下载已解析出的视频（调用方已从页面拿到视频流时使用，跳过网页抓取）
+
+        Args:
+            video_info: 视频信息
+
+        Returns:
+            Dict: 包含视频 URL 和本地路径的字典，失败返回 None
+        """
         success = await self.download_video(video_info)
         if not success:
             return None
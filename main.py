@@ -1,4 +1,10 @@
 import asyncio
+
+try:
+    import uvloop  # 可选依赖：pip install uvloop，基于 libuv 的事件循环，调度与 I/O 开销更低
+except ImportError:
+    uvloop = None
+
 from config.settings import RUN_DURATION, BASE_URL
 from core.browser_manager import BrowserManager
 from core.human_motion import HumanMotion
@@ -40,4 +46,7 @@ async def main():
         await bm.disconnect()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
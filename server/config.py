@@ -27,6 +27,9 @@ HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8000"))
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "100"))
 
+# Transcript cache (entries kept in memory, keyed by upload SHA-256; 0 disables)
+TRANSCRIPT_CACHE_SIZE = int(os.getenv("TRANSCRIPT_CACHE_SIZE", "512"))
+
 # Temp files
 TEMP_DIR = BASE_DIR / "temp"
 TEMP_FILE_EXPIRE_HOURS = int(os.getenv("TEMP_FILE_EXPIRE_HOURS", "1"))
@@ -1,18 +1,21 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+import json
 import logging
 from pathlib import Path
 import time
-from typing import Optional
+from typing import Iterator, List, Optional
 
 from config import (
     HOST, PORT, MAX_FILE_SIZE_MB,
-    WHISPER_CPP_PATH, MODEL_PATH
+    WHISPER_CPP_PATH, MODEL_PATH,
+    TRANSCRIPT_CACHE_SIZE
 )
 from transcriber import WhisperTranscriber
 from utils.audio_converter import AudioConverter
 from utils.file_manager import TempFileManager
+from utils.transcript_cache import TranscriptCache, sha256_fileobj
 
 # Setup logging
 logging.basicConfig(
@@ -52,6 +55,7 @@ except Exception as e:
 
 audio_converter = AudioConverter()
 file_manager = TempFileManager()
+transcript_cache = TranscriptCache(max_entries=TRANSCRIPT_CACHE_SIZE)
 
 # File size limit in bytes
 MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
@@ -78,30 +82,16 @@ async def get_info():
     }
 
 
-@app.post("/transcribe")
-async def transcribe_audio(
-    file: UploadFile = File(...),
-    language: Optional[str] = Form(None),
-    task: str = Form("transcribe")
-):
+async def _prepare_wav(file: UploadFile, request_id: str) -> dict:
     """
-    Transcribe audio/video file.
-
-    Args:
-        file: Audio or video file
-        language: Language code (optional, auto-detect if not provided)
-        task: "transcribe" or "translate"
+    Check size, save the upload and convert it to 16kHz mono WAV.
 
     Returns:
-        JSON with transcription result
-    """
-    if not WHISPER_READY:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Whisper service not ready"
-        )
+        Dict with keys: wav_path, duration, start_time, upload_time, convert_time
 
-    request_id = file_manager.get_unique_filename()[:8]
+    Raises:
+        HTTPException: On size limit or conversion failure
+    """
     logger.info(f"[{request_id}] New transcription request: {file.filename}")
 
     # Check file size
@@ -155,44 +145,14 @@ async def transcribe_audio(
         except:
             duration = 0.0
 
-        # Transcribe
-        transcribe_start = time.time()
-        try:
-            result = transcriber.transcribe(
-                str(wav_path),
-                language=language,
-                task=task
-            )
-            transcribe_time = time.time() - transcribe_start
-            logger.info(f"[{request_id}] Transcription completed in {transcribe_time:.2f}s")
-        except Exception as e:
-            logger.error(f"[{request_id}] Transcription failed: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Transcription failed: {str(e)}"
-            )
-        finally:
-            # Clean up WAV file
-            wav_path.unlink(missing_ok=True)
-
-        total_time = time.time() - start_time
-
-        # Build response
-        response = {
-            "text": result["text"],
-            "language": result["language"],
-            "duration": round(duration, 2),
-            "processing_time": round(total_time, 2)
+        return {
+            "wav_path": wav_path,
+            "duration": duration,
+            "start_time": start_time,
+            "upload_time": upload_time,
+            "convert_time": convert_time
         }
 
-        logger.info(
-            f"[{request_id}] Request completed in {total_time:.2f}s "
-            f"(upload: {upload_time:.2f}s, convert: {convert_time:.2f}s, "
-            f"transcribe: {transcribe_time:.2f}s)"
-        )
-
-        return response
-
     except HTTPException:
         raise
     except Exception as e:
@@ -203,6 +163,230 @@ async def transcribe_audio(
         )
 
 
+def _lookup_cached(
+    file: UploadFile,
+    language: Optional[str],
+    task: str,
+    request_id: str,
+    expected_sha256: Optional[str] = None
+) -> tuple:
+    """
+    Hash the upload and look it up in the transcript cache.
+
+    Returns:
+        (digest, cached result or None)
+
+    Raises:
+        HTTPException: If X-Content-SHA256 does not match the uploaded bytes
+    """
+    digest = sha256_fileobj(file.file)
+    if expected_sha256 and expected_sha256.strip().lower() != digest:
+        logger.warning(f"[{request_id}] X-Content-SHA256 mismatch for {file.filename}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="X-Content-SHA256 does not match uploaded content"
+        )
+
+    cached = transcript_cache.get(digest, language, task)
+    if cached is not None:
+        logger.info(f"[{request_id}] Transcript cache hit: {file.filename}")
+    return digest, cached
+
+
+async def _transcribe_upload(
+    file: UploadFile,
+    language: Optional[str],
+    task: str,
+    request_id: str,
+    expected_sha256: Optional[str] = None
+) -> dict:
+    """
+    Run the save -> convert -> transcribe pipeline for one uploaded file.
+
+    Identical uploads (same bytes, language and task) are answered from
+    the transcript cache without running whisper.cpp again.
+
+    Returns:
+        Dict with keys: text, language, duration, processing_time
+
+    Raises:
+        HTTPException: On size limit, hash mismatch, conversion or transcription failure
+    """
+    digest, cached = _lookup_cached(file, language, task, request_id, expected_sha256)
+    if cached is not None:
+        return {**cached, "processing_time": 0.0}
+
+    prepared = await _prepare_wav(file, request_id)
+    wav_path = prepared["wav_path"]
+
+    # Transcribe
+    transcribe_start = time.time()
+    try:
+        result = transcriber.transcribe(
+            str(wav_path),
+            language=language,
+            task=task
+        )
+        transcribe_time = time.time() - transcribe_start
+        logger.info(f"[{request_id}] Transcription completed in {transcribe_time:.2f}s")
+    except Exception as e:
+        logger.error(f"[{request_id}] Transcription failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Transcription failed: {str(e)}"
+        )
+    finally:
+        # Clean up WAV file
+        wav_path.unlink(missing_ok=True)
+
+    total_time = time.time() - prepared["start_time"]
+
+    # Build response
+    response = {
+        "text": result["text"],
+        "language": result["language"],
+        "duration": round(prepared["duration"], 2),
+        "processing_time": round(total_time, 2)
+    }
+
+    logger.info(
+        f"[{request_id}] Request completed in {total_time:.2f}s "
+        f"(upload: {prepared['upload_time']:.2f}s, convert: {prepared['convert_time']:.2f}s, "
+        f"transcribe: {transcribe_time:.2f}s)"
+    )
+
+    transcript_cache.set(digest, language, task, response)
+    return response
+
+
+def _stream_transcription(
+    wav_path: Path,
+    language: Optional[str],
+    task: str,
+    request_id: str,
+    prepared: dict,
+    digest: str
+) -> Iterator[bytes]:
+    """
+    Yield NDJSON lines: one {"segment": ...} per whisper.cpp segment,
+    then a final {"done": true, ...} summary or an {"error": ...} line.
+    """
+    try:
+        segments = []
+        for segment in transcriber.transcribe_stream(str(wav_path), language=language, task=task):
+            segments.append(segment)
+            yield (json.dumps({"segment": segment}, ensure_ascii=False) + "\n").encode("utf-8")
+        total_time = time.time() - prepared["start_time"]
+        logger.info(f"[{request_id}] Streaming request completed in {total_time:.2f}s")
+        summary = {
+            "language": language or "unknown",
+            "duration": round(prepared["duration"], 2),
+            "processing_time": round(total_time, 2)
+        }
+        # The streaming path doesn't detect the language, so only cache when it was given;
+        # otherwise a later auto-detect request would get "unknown" from the cache
+        if language:
+            transcript_cache.set(digest, language, task, {"text": " ".join(segments), **summary})
+        yield (json.dumps({"done": True, **summary}) + "\n").encode("utf-8")
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error(f"[{request_id}] Transcription failed: {e}")
+        yield (json.dumps({"error": f"Transcription failed: {str(e)}"}, ensure_ascii=False) + "\n").encode("utf-8")
+    finally:
+        wav_path.unlink(missing_ok=True)
+
+
+@app.post("/transcribe")
+async def transcribe_audio(
+    request: Request,
+    file: UploadFile = File(...),
+    language: Optional[str] = Form(None),
+    task: str = Form("transcribe"),
+    x_content_sha256: Optional[str] = Header(None)
+):
+    """
+    Transcribe audio/video file.
+
+    Send "Accept: application/x-ndjson" to receive segments as they are
+    produced instead of one JSON body at the end. Cached results are
+    always returned as plain JSON.
+
+    Args:
+        file: Audio or video file
+        language: Language code (optional, auto-detect if not provided)
+        task: "transcribe" or "translate"
+        x_content_sha256: Optional SHA-256 of the file, verified against the upload
+
+    Returns:
+        JSON with transcription result, or an NDJSON stream of segments
+    """
+    if not WHISPER_READY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Whisper service not ready"
+        )
+
+    request_id = file_manager.get_unique_filename()[:8]
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        digest, cached = _lookup_cached(file, language, task, request_id, x_content_sha256)
+        if cached is not None:
+            return {**cached, "processing_time": 0.0}
+        prepared = await _prepare_wav(file, request_id)
+        return StreamingResponse(
+            _stream_transcription(prepared["wav_path"], language, task, request_id, prepared, digest),
+            media_type="application/x-ndjson"
+        )
+
+    return await _transcribe_upload(file, language, task, request_id, x_content_sha256)
+
+
+@app.post("/transcribe_batch")
+async def transcribe_batch(
+    files: List[UploadFile] = File(...),
+    language: Optional[str] = Form(None),
+    task: str = Form("transcribe")
+):
+    """
+    Transcribe several audio/video files in one request.
+
+    Files are processed one after another; a failure on one file is
+    reported in "errors" and does not fail the whole batch.
+
+    Args:
+        files: Audio or video files (repeated "files" field)
+        language: Language code (optional, auto-detect if not provided)
+        task: "transcribe" or "translate"
+
+    Returns:
+        JSON with "results" ({filename: text}) and "errors" ({filename: detail})
+    """
+    if not WHISPER_READY:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Whisper service not ready"
+        )
+
+    batch_id = file_manager.get_unique_filename()[:8]
+    logger.info(f"[{batch_id}] New batch transcription request: {len(files)} files")
+    start_time = time.time()
+
+    results = {}
+    errors = {}
+    for i, file in enumerate(files):
+        try:
+            result = await _transcribe_upload(file, language, task, f"{batch_id}-{i}")
+            results[file.filename] = result["text"]
+        except HTTPException as e:
+            errors[file.filename] = e.detail
+
+    return {
+        "results": results,
+        "errors": errors,
+        "processing_time": round(time.time() - start_time, 2)
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     """Run on server startup"""
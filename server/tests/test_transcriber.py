@@ -35,3 +35,24 @@ def test_transcribe_audio():
     assert "language" in result
     assert isinstance(result["text"], str)
     assert len(result["text"]) > 0
+
+def test_transcribe_stream_yields_segments(tmp_path):
+    """Test streaming transcription with a stand-in whisper.cpp binary"""
+    fake_cli = tmp_path / "whisper-cli"
+    fake_cli.write_text(
+        "#!/bin/sh\n"
+        "echo 'whisper_init_from_file: loading model'\n"
+        "echo '[zh] detected'\n"
+        "echo '第一段'\n"
+        "echo ''\n"
+        "echo '第二段'\n"
+    )
+    fake_cli.chmod(0o755)
+    model = tmp_path / "model.bin"
+    model.write_bytes(b"")
+    audio = tmp_path / "audio.wav"
+    audio.write_bytes(b"")
+
+    transcriber = WhisperTranscriber(whisper_cpp_path=str(fake_cli), model_path=str(model))
+
+    assert list(transcriber.transcribe_stream(str(audio), language="zh")) == ["第一段", "第二段"]
@@ -0,0 +1,33 @@
+import hashlib
+import io
+from utils.transcript_cache import TranscriptCache, sha256_fileobj
+
+def test_sha256_fileobj_rewinds():
+    """Test hashing matches hashlib and leaves the file at the start"""
+    data = b"audio" * 1000
+    f = io.BytesIO(data)
+    f.seek(10)
+
+    assert sha256_fileobj(f) == hashlib.sha256(data).hexdigest()
+    assert f.tell() == 0
+
+def test_cache_keys_on_language_and_task():
+    """Test the same content with different options is cached separately"""
+    cache = TranscriptCache(max_entries=2)
+    cache.set("abc", "zh", "transcribe", {"text": "你好"})
+
+    assert cache.get("abc", "zh", "transcribe") == {"text": "你好"}
+    assert cache.get("abc", "en", "transcribe") is None
+    assert cache.get("abc", "zh", "translate") is None
+
+def test_cache_evicts_least_recently_used():
+    """Test LRU eviction once max_entries is exceeded"""
+    cache = TranscriptCache(max_entries=2)
+    cache.set("a", None, "transcribe", {"text": "a"})
+    cache.set("b", None, "transcribe", {"text": "b"})
+    cache.get("a", None, "transcribe")
+    cache.set("c", None, "transcribe", {"text": "c"})
+
+    assert cache.get("b", None, "transcribe") is None
+    assert cache.get("a", None, "transcribe") == {"text": "a"}
+    assert cache.get("c", None, "transcribe") == {"text": "c"}
@@ -1,8 +1,9 @@
 import subprocess
 import logging
 import re
+import threading
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from config import WHISPER_CPP_PATH, MODEL_PATH
 
 logger = logging.getLogger(__name__)
@@ -65,24 +66,7 @@ class WhisperTranscriber:
         if not Path(audio_path).exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
-        # Build whisper.cpp command
-        # Note: whisper-cli outputs to stdout by default, don't use --output-txt
-        cmd = [
-            str(self.whisper_cpp_path),
-            "-m", str(self.model_path),
-            "-f", audio_path,
-            "--no-timestamps",  # Don't output timestamps for cleaner text
-            "-np",  # No prints (only results)
-        ]
-
-        if language:
-            cmd.extend(["-l", language])
-        
-        # IMPORTANT: Only add --translate when explicitly requested
-        # Otherwise Chinese audio with -l zh should output Chinese, not English
-        if task == "translate":
-            cmd.append("-tr")  # Use short form --translate
-
+        cmd = self._build_command(audio_path, language, task)
         logger.info(f"Running whisper.cpp: {' '.join(cmd)}")
 
         try:
@@ -127,6 +111,90 @@ class WhisperTranscriber:
             logger.error(f"Transcription error: {e}")
             raise
 
+    def transcribe_stream(
+        self,
+        audio_path: str,
+        language: Optional[str] = None,
+        task: str = "transcribe"
+    ) -> Iterator[str]:
+        """
+        Transcribe audio file, yielding text segments as whisper.cpp prints them.
+
+        Args:
+            audio_path: Path to 16kHz WAV file
+            language: Language code (e.g., "zh", "en"). None for auto-detect.
+            task: "transcribe" or "translate"
+
+        Yields:
+            Text segments in order
+
+        Raises:
+            Exception: If transcription fails or times out
+        """
+        if not Path(audio_path).exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        cmd = self._build_command(audio_path, language, task)
+        logger.info(f"Running whisper.cpp (streaming): {' '.join(cmd)}")
+
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        # Drain stderr on a thread so a full stderr pipe can't stall stdout
+        stderr_chunks = []
+        drain = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)
+        drain.start()
+        # Same 5 minute limit as transcribe(); kill the process if exceeded
+        timer = threading.Timer(300, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                line = line.strip()
+                if not line or line.startswith('[') or 'whisper_' in line:
+                    continue
+                yield line
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            drain.join()
+        stderr = "".join(stderr_chunks)
+
+        if returncode != 0:
+            logger.error(f"whisper.cpp failed: {stderr}")
+            raise Exception(f"Transcription failed: {stderr or f'exit code {returncode}'}")
+
+    def _build_command(
+        self,
+        audio_path: str,
+        language: Optional[str],
+        task: str
+    ) -> list:
+        """Build the whisper.cpp command line."""
+        # Note: whisper-cli outputs to stdout by default, don't use --output-txt
+        cmd = [
+            str(self.whisper_cpp_path),
+            "-m", str(self.model_path),
+            "-f", audio_path,
+            "--no-timestamps",  # Don't output timestamps for cleaner text
+            "-np",  # No prints (only results)
+        ]
+
+        if language:
+            cmd.extend(["-l", language])
+
+        # IMPORTANT: Only add --translate when explicitly requested
+        # Otherwise Chinese audio with -l zh should output Chinese, not English
+        if task == "translate":
+            cmd.append("-tr")  # Use short form --translate
+
+        return cmd
+
     def _parse_output(self, output: str) -> str:
         """
         Parse whisper.cpp output to extract text.
@@ -0,0 +1,57 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_fileobj(fileobj: BinaryIO) -> str:
+    """
+    Hash a file object from the start and rewind it.
+
+    Args:
+        fileobj: Seekable binary file object
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    fileobj.seek(0)
+    h = hashlib.sha256()
+    while chunk := fileobj.read(HASH_CHUNK_SIZE):
+        h.update(chunk)
+    fileobj.seek(0)
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    """In-memory LRU cache of transcription results keyed by content hash"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+
+    def get(self, digest: str, language: Optional[str], task: str) -> Optional[dict]:
+        """
+        Look up a cached result.
+
+        Returns:
+            Cached result dict or None
+        """
+        key = (digest, language, task)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def set(self, digest: str, language: Optional[str], task: str, result: dict) -> None:
+        """Store a result, evicting the least recently used entry if full"""
+        if self.max_entries <= 0:
+            return
+        key = (digest, language, task)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
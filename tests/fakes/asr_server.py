@@ -0,0 +1,87 @@
+"""
+本地假 ASR 服务
+
+与 server/server.py 的接口保持一致（/transcribe、/transcribe_batch、/health），
+完整接收上传内容后返回固定文本，不做真实转录。
+用于在没有 whisper.cpp 的环境下测试/分析 ResearchAgent 的上传链路。
+"""
+import socket
+
+from aiohttp import web
+
+
+class FakeASRServer:
+    """监听随机端口的假 ASR 服务"""
+
+    def __init__(self, transcript: str = "stub"):
+        """
+        Args:
+            transcript: 每个文件返回的转录文本
+        """
+        self.transcript = transcript
+        self.requests = 0  # 收到的转录请求数
+        self.files = 0  # 收到的文件数
+        self.bytes_received = 0  # 收到的文件内容字节数
+        self._runner: web.AppRunner | None = None
+        self._port: int | None = None
+
+    @property
+    def url(self) -> str:
+        """/transcribe 地址，可直接作为 ASR_SERVER_URL"""
+        return f"http://127.0.0.1:{self._port}/transcribe"
+
+    async def start(self) -> str:
+        """启动服务，返回 /transcribe 地址"""
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_get("/health", self._health)
+        app.router.add_post("/transcribe", self._transcribe)
+        app.router.add_post("/transcribe_batch", self._transcribe_batch)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        self._port = sock.getsockname()[1]
+        await web.SockSite(self._runner, sock).start()
+        return self.url
+
+    async def stop(self):
+        """停止服务"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _read_files(self, request: web.Request) -> list[str]:
+        """按块读完 multipart 中的所有文件，返回文件名列表"""
+        filenames = []
+        reader = await request.multipart()
+        async for part in reader:
+            if not part.filename:
+                await part.release()
+                continue
+            while chunk := await part.read_chunk():
+                self.bytes_received += len(chunk)
+            filenames.append(part.filename)
+        self.requests += 1
+        self.files += len(filenames)
+        return filenames
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "healthy", "whisper_ready": True, "model_loaded": True})
+
+    async def _transcribe(self, request: web.Request) -> web.Response:
+        await self._read_files(request)
+        return web.json_response({
+            "text": self.transcript,
+            "language": "zh",
+            "duration": 0.0,
+            "processing_time": 0.0,
+        })
+
+    async def _transcribe_batch(self, request: web.Request) -> web.Response:
+        filenames = await self._read_files(request)
+        return web.json_response({
+            "results": {name: self.transcript for name in filenames},
+            "errors": {},
+            "processing_time": 0.0,
+        })